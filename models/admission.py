@@ -0,0 +1,226 @@
+import heapq
+import itertools
+import math
+import threading
+import time
+from datetime import datetime
+
+# Priority classes (lower is served first)
+PRIORITY_ABNORMAL = 0
+PRIORITY_NON_COMPRESSED = 1
+PRIORITY_COMPRESSED = 2
+PRIORITY_STREAM = 3
+
+PRIORITY_NAMES = {
+    PRIORITY_ABNORMAL: 'abnormal',
+    PRIORITY_NON_COMPRESSED: 'non_compressed',
+    PRIORITY_COMPRESSED: 'compressed',
+    PRIORITY_STREAM: 'stream'
+}
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed instead of being processed"""
+
+    def __init__(self, status_code, reason, retry_after):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def deadline_from_timestamp(timestamp, budget_seconds):
+    """
+    Convert the sender's ISO timestamp into an absolute deadline (time.time() based)
+
+    Only timezone-aware timestamps are trusted: a naive one would be read in the
+    receiver's timezone, not the sender's. Timestamps that are missing,
+    unparseable, naive, in the future or older than the whole budget (both
+    clock skew, since the relay times out before that) fall back to the
+    arrival time.
+    """
+    now = time.time()
+    sent = now
+    if timestamp:
+        try:
+            parsed = datetime.fromisoformat(timestamp)
+            if parsed.tzinfo is not None and now - budget_seconds <= parsed.timestamp() <= now:
+                sent = parsed.timestamp()
+        except (TypeError, ValueError):
+            pass
+    return sent + budget_seconds
+
+
+class _Job:
+    __slots__ = ('func', 'args', 'priority', 'deadline', 'enqueued_at', 'state', 'result', 'error', 'done')
+
+    def __init__(self, func, args, priority, deadline):
+        self.func = func
+        self.args = args
+        self.priority = priority
+        self.deadline = deadline
+        self.enqueued_at = time.time()
+        self.state = 'queued'
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class AdmissionController:
+    """Bounded priority queue with deadline-aware admission in front of the model workers"""
+
+    def __init__(self, workers=2, max_queue_depth=64, smoothing=0.2):
+        """
+        Initialize the admission controller
+
+        Args:
+            workers: Number of worker threads executing admitted jobs
+            max_queue_depth: Queued jobs beyond this are rejected with 429
+            smoothing: Weight of the newest sample in the service time moving average
+        """
+        self.workers = workers
+        self.max_queue_depth = max_queue_depth
+        self.smoothing = smoothing
+
+        self._heap = []
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+        self._queued = 0
+        self._busy = 0
+        self._service_time = None
+
+        self.admitted = {name: 0 for name in PRIORITY_NAMES.values()}
+        self.completed = 0
+        self.shed_queue_full = 0
+        self.shed_evicted = 0
+        self.shed_deadline = 0
+        self.expired_in_queue = 0
+
+        for index in range(workers):
+            threading.Thread(target=self._worker, name=f"admission-worker-{index}", daemon=True).start()
+
+    def _estimate_wait(self, priority):
+        """Estimated seconds until a new job of this priority would finish"""
+        service_time = self._service_time or 0.0
+        ahead = sum(1 for entry in self._heap if entry[0] <= priority and entry[3].state == 'queued')
+        return (ahead + self._busy) * service_time / self.workers + service_time
+
+    def submit(self, func, *args, priority=PRIORITY_NON_COMPRESSED, deadline=None):
+        """
+        Queue ``func(*args)`` and block until it has run
+
+        Raises AdmissionRejected (429 when the queue is full, 503 when the
+        deadline cannot be met) instead of queueing work that would time out.
+        A full queue makes room for a higher-priority job by evicting the
+        newest job of the lowest queued priority, which then gets the 429.
+        """
+        now = time.time()
+        with self._cond:
+            if self._queued >= self.max_queue_depth and not self._evict_below(priority):
+                self.shed_queue_full += 1
+                retry_after = self._estimate_wait(max(PRIORITY_NAMES))
+                raise AdmissionRejected(429, 'Ingress queue full', max(1, math.ceil(retry_after)))
+
+            estimated_wait = self._estimate_wait(priority)
+            if deadline is not None and now + estimated_wait > deadline:
+                self.shed_deadline += 1
+                raise AdmissionRejected(503, 'Deadline cannot be met', max(1, math.ceil(estimated_wait)))
+
+            job = _Job(func, args, priority, deadline)
+            heapq.heappush(self._heap, (priority, deadline or math.inf, next(self._sequence), job))
+            self._queued += 1
+            self.admitted[PRIORITY_NAMES[priority]] += 1
+            self._cond.notify()
+
+        timeout = None if deadline is None else max(0.0, deadline - time.time())
+        if not job.done.wait(timeout):
+            with self._cond:
+                if job.state == 'queued':
+                    # Still waiting for a worker: drop it rather than do work nobody will read
+                    job.state = 'expired'
+                    self._queued -= 1
+                    self.expired_in_queue += 1
+                    raise AdmissionRejected(503, 'Deadline expired in queue', max(1, math.ceil(self._estimate_wait(priority))))
+            # Already running; the work is done soon, so return it
+            job.done.wait()
+
+        if job.state == 'expired':
+            raise AdmissionRejected(503, 'Deadline expired in queue', max(1, math.ceil(self._service_time or 0)))
+        if job.state == 'evicted':
+            raise AdmissionRejected(429, 'Evicted by a higher-priority request',
+                                    max(1, math.ceil(self._estimate_wait(priority))))
+        if job.error is not None:
+            raise job.error
+        return job.result
+
+    def _evict_below(self, priority):
+        """Drop the newest queued job with a lower priority than ``priority``; False if there is none"""
+        victim = max(
+            (entry for entry in self._heap if entry[0] > priority and entry[3].state == 'queued'),
+            key=lambda entry: (entry[0], entry[2]),
+            default=None
+        )
+        if victim is None:
+            return False
+        job = victim[3]
+        job.state = 'evicted'
+        self._queued -= 1
+        self.shed_evicted += 1
+        job.done.set()
+        return True
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                _, deadline, _, job = heapq.heappop(self._heap)
+                if job.state != 'queued':
+                    continue
+                self._queued -= 1
+                if time.time() > deadline:
+                    job.state = 'expired'
+                    self.expired_in_queue += 1
+                    job.done.set()
+                    continue
+                job.state = 'running'
+                self._busy += 1
+
+            start = time.time()
+            try:
+                job.result = job.func(*job.args)
+            except Exception as e:
+                job.error = e
+            elapsed = time.time() - start
+
+            with self._cond:
+                self._busy -= 1
+                self.completed += 1
+                if self._service_time is None:
+                    self._service_time = elapsed
+                else:
+                    self._service_time += self.smoothing * (elapsed - self._service_time)
+                job.state = 'done'
+            job.done.set()
+
+    def stats(self):
+        """Queue depth and shed counters"""
+        with self._cond:
+            depth = {name: 0 for name in PRIORITY_NAMES.values()}
+            for priority, _, _, job in self._heap:
+                if job.state == 'queued':
+                    depth[PRIORITY_NAMES[priority]] += 1
+            return {
+                'queue_depth': self._queued,
+                'queue_depth_by_priority': depth,
+                'max_queue_depth': self.max_queue_depth,
+                'workers': self.workers,
+                'busy_workers': self._busy,
+                'avg_service_time': self._service_time,
+                'admitted': dict(self.admitted),
+                'completed': self.completed,
+                'shed_queue_full': self.shed_queue_full,
+                'shed_evicted': self.shed_evicted,
+                'shed_deadline': self.shed_deadline,
+                'expired_in_queue': self.expired_in_queue
+            }
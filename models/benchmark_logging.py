@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark the per-request logging overhead of the receiver hot path
+
+Compares the previous setup (logging.basicConfig, synchronous StreamHandler,
+eager f-string messages) against log_pipeline (background queue listener,
+lazily formatted messages, per-event rate limiting). Output goes to
+os.devnull so only the logging cost on the request thread is measured.
+"""
+
+import argparse
+import logging
+import os
+import time
+import numpy as np
+from config import config
+from log_pipeline import build_queue_handler
+
+
+def requests_before(logger, count, payload, data):
+    """Log calls made per compressed request before the logging pipeline"""
+    for _ in range(count):
+        logger.info(f"Processing compressed data with timestamp: {payload['timestamp']}")
+        logger.info(f"Compressed data size: {payload.get('compressed_size', 'N/A')}")
+        logger.info(f"Compression type: {payload.get('compression_type', 'N/A')}")
+        logger.info(f"Decompressed data shape: {data.shape if hasattr(data, 'shape') else 'N/A'}")
+        for model_type in ("decompressed", "zlib"):
+            logger.info(f"Running {model_type} models on data shape: {data.reshape(1, -1).shape}")
+            logger.info(f"{model_type} models completed in {0.0123:.4f} seconds")
+        logger.info(f"Compressed data for zlib models shape: {data.reshape(1, -1).shape}")
+        logger.info(f"Successfully processed compressed data - stored {12} and {12} results")
+
+
+def requests_after(logger, count, payload, data):
+    """Log calls made per compressed request with the logging pipeline"""
+    for _ in range(count):
+        logger.info("Processing compressed data with timestamp: %s (size: %s, type: %s)", payload['timestamp'],
+                    payload.get('compressed_size', 'N/A'), payload.get('compression_type', 'N/A'))
+        logger.debug("Decompressed data shape: %s", data.shape)
+        for model_type in ("decompressed", "zlib"):
+            logger.info("Running %s models (%s) on data shape: %s", model_type, "ensemble", data.reshape(1, -1).shape)
+            logger.info("%s models completed in %.4f seconds", model_type, 0.0123)
+        logger.debug("Compressed data for zlib models shape: %s", data.reshape(1, -1).shape)
+        logger.debug("Successfully processed compressed data - stored %d and %d results", 12, 12)
+
+
+def time_requests(func, logger, count, payload, data):
+    """Microseconds of logging overhead per request"""
+    start = time.perf_counter()
+    func(logger, count, payload, data)
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def isolated_logger(name, handler):
+    logger = logging.getLogger(name)
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(config.LOG_LEVEL)
+    return logger
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Logging overhead benchmark")
+    parser.add_argument('--requests', type=int, default=20000)
+    args = parser.parse_args()
+
+    payload = {'timestamp': '2024-01-01T00:00:00', 'compressed_size': 612, 'compression_type': 'zlib'}
+    data = np.zeros(187, dtype=np.float32)
+
+    with open(os.devnull, 'w') as devnull:
+        sync_handler = logging.StreamHandler(devnull)
+        sync_handler.setFormatter(logging.Formatter(config.LOG_FORMAT))
+        before = time_requests(requests_before, isolated_logger("bench.before", sync_handler),
+                               args.requests, payload, data)
+
+        rows = [("before: basicConfig, sync, f-strings", before)]
+        for label, max_per_second in (("after: queue, lazy, no rate limit", None),
+                                      (f"after: queue, lazy, {config.LOG_MAX_PER_SECOND}/s per event", config.LOG_MAX_PER_SECOND)):
+            handler, listener = build_queue_handler(devnull, config.LOG_JSON, config.LOG_SAMPLE_RATE, max_per_second)
+            listener.start()
+            logger = isolated_logger(f"bench.{max_per_second}", handler)
+            rows.append((label, time_requests(requests_after, logger, args.requests, payload, data)))
+            listener.stop()
+
+    print(f"Logging overhead per compressed request ({args.requests} requests)")
+    for label, micros in rows:
+        print(f"   {label:<45} {micros:8.1f} us  ({before / micros:4.1f}x)")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark the startup cost of the configuration module
+
+Each scenario runs in a fresh interpreter and measures ``import config`` (via
+``-X importtime``, so it covers config and everything it pulls in) and the
+wall time of ``config.print_config()``, which is what server.py and
+receiver.py do before anything else. Scenarios cover a cold discovery cache,
+a warm cache, and offline mode; each uses its own temporary cache file.
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+SCRIPT = """
+import time
+start = time.perf_counter()
+from config import config
+imported = time.perf_counter()
+config.print_config()
+printed = time.perf_counter()
+print(f"STARTUP {imported - start:.6f} {printed - imported:.6f}")
+"""
+
+IMPORT_TIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|\s+(\S+)")
+
+
+def run_once(env):
+    """(import_config_us, import_requests_loaded, print_config_s) from one fresh interpreter"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", SCRIPT],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env, capture_output=True, text=True, timeout=60
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    import_us = 0
+    loaded_requests = False
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if not match:
+            continue
+        module = match.group(3)
+        if module == "config":
+            import_us = int(match.group(2))
+        elif module == "requests":
+            loaded_requests = True
+
+    _, _, print_seconds = result.stdout.strip().splitlines()[-1].split()
+    return import_us, loaded_requests, float(print_seconds)
+
+
+def scenario(label, runs, offline, warm):
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(os.environ)
+        env["ECG_DISCOVERY_CACHE"] = os.path.join(directory, "endpoints.json")
+        env["ECG_OFFLINE"] = "1" if offline else "0"
+        if warm:
+            # Populate the cache from a standalone run that waits for discovery
+            subprocess.run([sys.executable, "config.py"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                           env=env, capture_output=True, timeout=60)
+
+        samples = [run_once(env) for _ in range(runs)]
+    import_ms = sorted(sample[0] for sample in samples)[len(samples) // 2] / 1000
+    print_ms = sorted(sample[2] for sample in samples)[len(samples) // 2] * 1000
+    loaded_requests = any(sample[1] for sample in samples)
+    print(f"   {label:<24} import config {import_ms:7.1f} ms   print_config {print_ms:7.1f} ms"
+          f"   requests imported: {'yes' if loaded_requests else 'no'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Config import / print_config startup benchmark")
+    parser.add_argument('--runs', type=int, default=5, help="Fresh interpreters per scenario (median is reported)")
+    args = parser.parse_args()
+
+    print(f"Startup cost, median of {args.runs} fresh interpreters")
+    scenario("cold cache", args.runs, offline=False, warm=False)
+    scenario("warm cache", args.runs, offline=False, warm=True)
+    scenario("offline (ECG_OFFLINE=1)", args.runs, offline=True, warm=False)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark SharedRingBuffer against pickled multiprocessing.Queue IPC
+
+For each payload shape a consumer process receives rows and replies with a
+small ack over the same kind of queue in both cases, so the difference is the
+cost of moving the feature rows between processes:
+
+- round trip: one row in flight at a time (per-request latency)
+- throughput: a stream of rows with the consumer draining as fast as it can
+"""
+
+import argparse
+import multiprocessing as mp
+import time
+import numpy as np
+from shm_transport import SharedRingBuffer
+
+CASES = [
+    ("187 x float32 (non-compressed row)", (1, 187), np.float32),
+    ("667 x uint8 (zlib features)", (1, 667), np.uint8),
+    ("8 x 667 float32 batch", (8, 667), np.float32)
+]
+
+
+def _ring_consumer(ring, acks, count):
+    for _ in range(count):
+        ticket, request_id, _, rows = ring.get()
+        checksum = float(rows[0, 0])
+        ring.release(ticket)
+        acks.put((request_id, checksum))
+
+
+def _queue_consumer(requests, acks, count):
+    for _ in range(count):
+        request_id, rows = requests.get()
+        acks.put((request_id, float(rows[0, 0])))
+
+
+def run_case(ctx, transport, rows, count, pipelined):
+    """Seconds per message for one transport"""
+    acks = ctx.Queue()
+    if transport == 'shm':
+        ring = SharedRingBuffer(slots=64, max_rows=rows.shape[0], max_features=rows.shape[1], ctx=ctx)
+        consumer = ctx.Process(target=_ring_consumer, args=(ring, acks, count))
+        send = lambda request_id: ring.put(rows, request_id)
+    else:
+        requests = ctx.Queue()
+        consumer = ctx.Process(target=_queue_consumer, args=(requests, acks, count))
+        send = lambda request_id: requests.put((request_id, rows))
+    consumer.start()
+
+    # Warm up the consumer and the pipes before timing
+    send(0)
+    acks.get()
+    count -= 1
+
+    start = time.perf_counter()
+    if pipelined:
+        for request_id in range(1, count + 1):
+            send(request_id)
+        for _ in range(count):
+            acks.get()
+    else:
+        for request_id in range(1, count + 1):
+            send(request_id)
+            acks.get()
+    elapsed = time.perf_counter() - start
+
+    consumer.join()
+    if transport == 'shm':
+        ring.close()
+    return elapsed / count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shared-memory vs queue IPC benchmark")
+    parser.add_argument('--messages', type=int, default=5000)
+    args = parser.parse_args()
+
+    ctx = mp.get_context('spawn')
+    print(f"IPC cost per message ({args.messages} messages, spawn context)")
+    for label, shape, dtype in CASES:
+        rows = np.random.default_rng(0).random(shape).astype(dtype)
+        print(f"\n📦 {label}")
+        for pipelined, mode in ((False, "round trip"), (True, "throughput")):
+            queue_time = run_case(ctx, 'queue', rows, args.messages, pipelined)
+            shm_time = run_case(ctx, 'shm', rows, args.messages, pipelined)
+            print(f"   {mode:<11} queue: {queue_time * 1e6:7.1f} us   shm ring: {shm_time * 1e6:7.1f} us   "
+                  f"({queue_time / shm_time:4.1f}x)")
@@ -0,0 +1,127 @@
+import threading
+from collections import Counter
+import numpy as np
+
+
+def prediction_margin(model, data):
+    """
+    Predict one row and return (prediction, margin)
+
+    The margin is the gap between the two highest class probabilities. Models
+    without ``predict_proba`` (e.g. SVC trained with probability=False) return
+    a margin of None, which the cascade treats as "not confident".
+    """
+    if not hasattr(model, 'predict_proba'):
+        return model.predict(data)[0], None
+
+    proba = model.predict_proba(data)[0]
+    if len(proba) < 2:
+        return model.classes_[0], 1.0
+    best = int(np.argmax(proba))
+    runner_up = np.partition(proba, -2)[-2]
+    return model.classes_[best], float(proba[best] - runner_up)
+
+
+def majority_vote(predictions):
+    """Most common prediction, ties broken by the order predictions were given"""
+    return Counter(predictions).most_common(1)[0][0]
+
+
+class CascadeStats:
+    """Counters for cascade mode: which stage answered, compute saved and agreement lost"""
+
+    def __init__(self, smoothing=0.1):
+        self.smoothing = smoothing
+        self.lock = threading.Lock()
+        self.model_time = {}  # (model set, model name) -> moving average seconds
+        self.requests = 0
+        self.stage_counts = Counter()
+        self.models_run = 0
+        self.models_available = 0
+        self.time_spent = 0.0
+        self.time_saved_estimate = 0.0
+        self.audits = 0
+        self.audit_agreements = 0
+
+    def record_model_time(self, set_name, model_name, elapsed):
+        """
+        Update the moving average latency of a model (from either mode)
+
+        Keyed by model set as well: the standard (187 features) and zlib (667
+        features) variants of a model have very different costs.
+        """
+        key = (set_name, model_name)
+        with self.lock:
+            previous = self.model_time.get(key)
+            if previous is None:
+                self.model_time[key] = elapsed
+            else:
+                self.model_time[key] = previous + self.smoothing * (elapsed - previous)
+
+    def record_cascade(self, set_name, stage_name, models_run, skipped_models, elapsed):
+        """Record one cascade decision"""
+        with self.lock:
+            self.requests += 1
+            self.stage_counts[stage_name] += 1
+            self.models_run += models_run
+            self.models_available += models_run + len(skipped_models)
+            self.time_spent += elapsed
+            self.time_saved_estimate += sum(self.model_time.get((set_name, name), 0.0) for name in skipped_models)
+
+    def record_audit(self, cascade_prediction, ensemble_prediction):
+        """Record a sampled comparison against the full-ensemble majority vote"""
+        with self.lock:
+            self.audits += 1
+            if cascade_prediction == ensemble_prediction:
+                self.audit_agreements += 1
+
+    def snapshot(self):
+        """Raw counters as plain data (model worker processes send these to the HTTP process)"""
+        with self.lock:
+            return {
+                'model_time': dict(self.model_time),
+                'requests': self.requests,
+                'stage_counts': dict(self.stage_counts),
+                'models_run': self.models_run,
+                'models_available': self.models_available,
+                'time_spent': self.time_spent,
+                'time_saved_estimate': self.time_saved_estimate,
+                'audits': self.audits,
+                'audit_agreements': self.audit_agreements
+            }
+
+    @classmethod
+    def merged(cls, snapshots):
+        """Statistics combining snapshots from several processes (model latencies are averaged)"""
+        stats = cls()
+        model_times = {}
+        for snapshot in snapshots:
+            for key, elapsed in snapshot['model_time'].items():
+                model_times.setdefault(key, []).append(elapsed)
+            stats.stage_counts.update(snapshot['stage_counts'])
+            for name in ('requests', 'models_run', 'models_available', 'time_spent', 'time_saved_estimate',
+                         'audits', 'audit_agreements'):
+                setattr(stats, name, getattr(stats, name) + snapshot[name])
+        stats.model_time = {key: sum(times) / len(times) for key, times in model_times.items()}
+        return stats
+
+    def summary(self):
+        """Snapshot of the cascade statistics"""
+        with self.lock:
+            full_cost = self.time_spent + self.time_saved_estimate
+            avg_model_time = {}
+            for (set_name, model_name), elapsed in self.model_time.items():
+                avg_model_time.setdefault(set_name, {})[model_name] = elapsed
+            return {
+                'requests': self.requests,
+                'answered_by_stage': dict(self.stage_counts),
+                'models_run': self.models_run,
+                'models_skipped': self.models_available - self.models_run,
+                'avg_model_time': avg_model_time,
+                'time_spent': self.time_spent,
+                'time_saved_estimate': self.time_saved_estimate,
+                'compute_saved_fraction': self.time_saved_estimate / full_cost if full_cost else 0.0,
+                'audits': self.audits,
+                'agreement_rate': self.audit_agreements / self.audits if self.audits else None,
+                'agreement_lost': 1 - self.audit_agreements / self.audits if self.audits else None
+            }
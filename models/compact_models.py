@@ -0,0 +1,222 @@
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Fitted attributes that are only kept for diagnostics and never read by predict()
+PRUNABLE_ATTRIBUTES = ('oob_score_', 'oob_decision_function_', 'oob_prediction_', 'evals_result_')
+
+
+def prune_attributes(model):
+    """Drop diagnostic-only fitted attributes in place; returns the names removed"""
+    removed = [name for name in PRUNABLE_ATTRIBUTES if name in getattr(model, '__dict__', {})]
+    for name in removed:
+        delattr(model, name)
+    return removed
+
+
+class CompactKNN:
+    """
+    KNeighborsClassifier (euclidean, brute force) over a compact copy of the training data
+
+    Training rows are stored as uint8 when that is lossless (the zlib byte
+    features) and as float32 otherwise, with their squared norms precomputed.
+    Distances are computed in training-row chunks as
+    ``|x|^2 - 2 x.y + |y|^2``, in float64 for uint8 data (exact) and float32
+    for float32 data, so no full-size float64 copy is ever materialised.
+    """
+
+    def __init__(self, model, chunk_rows=2048):
+        fit_X = np.asarray(model._fit_X)
+        as_uint8 = fit_X.astype(np.uint8)
+        if np.array_equal(as_uint8, fit_X):
+            self.fit_X = as_uint8
+            self.compute_dtype = np.float64
+        else:
+            self.fit_X = fit_X.astype(np.float32)
+            self.compute_dtype = np.float32
+        self.fit_sq_norms = np.einsum('ij,ij->i', self.fit_X.astype(np.float64), self.fit_X.astype(np.float64))
+
+        self.classes_ = model.classes_
+        self.labels = np.asarray(model._y).astype(np.min_scalar_type(len(self.classes_)))
+        self.n_neighbors = model.n_neighbors
+        self.weights = model.weights
+        self.chunk_rows = chunk_rows
+
+    @staticmethod
+    def supports(model):
+        return (getattr(model, 'effective_metric_', None) == 'euclidean'
+                and model.weights in ('uniform', 'distance')
+                and not getattr(model, 'outputs_2d_', False))
+
+    def _sq_distances(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        x_sq_norms = np.einsum('ij,ij->i', X, X)
+        query = X.astype(self.compute_dtype)
+        distances = np.empty((len(X), len(self.fit_X)), dtype=np.float64)
+        for start in range(0, len(self.fit_X), self.chunk_rows):
+            stop = start + self.chunk_rows
+            block = self.fit_X[start:stop].astype(self.compute_dtype)
+            distances[:, start:stop] = -2 * (query @ block.T)
+        distances += x_sq_norms[:, None]
+        distances += self.fit_sq_norms
+        return np.maximum(distances, 0, out=distances)
+
+    def kneighbors(self, X):
+        """(distances, indices) of the n_neighbors nearest training rows, nearest first"""
+        sq_distances = self._sq_distances(X)
+        k = self.n_neighbors
+        nearest = np.argpartition(sq_distances, k - 1, axis=1)[:, :k]
+        nearest_sq = np.take_along_axis(sq_distances, nearest, axis=1)
+        order = np.argsort(nearest_sq, axis=1, kind='stable')
+        nearest = np.take_along_axis(nearest, order, axis=1)
+        return np.sqrt(np.take_along_axis(nearest_sq, order, axis=1)), nearest
+
+    def predict_proba(self, X):
+        distances, nearest = self.kneighbors(X)
+        if self.weights == 'distance':
+            # Same rule as sklearn: exact matches take all the weight
+            with np.errstate(divide='ignore'):
+                weights = 1.0 / distances
+            exact = np.isinf(weights)
+            exact_rows = exact.any(axis=1)
+            weights[exact_rows] = exact[exact_rows]
+        else:
+            weights = np.ones_like(distances)
+
+        proba = np.zeros((len(nearest), len(self.classes_)))
+        np.add.at(proba, (np.arange(len(nearest))[:, None], self.labels[nearest]), weights)
+        proba /= proba.sum(axis=1, keepdims=True)
+        return proba
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+    def probe_rows(self, rng, n_rows):
+        """Training rows and midpoints between random pairs (rows near decision boundaries)"""
+        first = self.fit_X[rng.integers(len(self.fit_X), size=n_rows)].astype(np.float64)
+        second = self.fit_X[rng.integers(len(self.fit_X), size=n_rows)].astype(np.float64)
+        midpoints = (first + second) / 2
+        if self.fit_X.dtype == np.uint8:
+            midpoints = np.round(midpoints)
+        return np.vstack((first[:n_rows // 2], midpoints[n_rows // 2:]))
+
+
+class CompactForest:
+    """
+    Random forest / extra trees classifier with every tree packed into flat arrays
+
+    Per node: feature and child indices as int32 and the split threshold as
+    float32, where sklearn stores 64-byte node records plus float64 values.
+    sklearn compares float32 inputs against float64 thresholds, so each
+    threshold is rounded *down* to the nearest float32; ``x <= t`` then gives
+    the same answer for every float32 ``x``. Leaves point back to themselves,
+    which lets all trees for all rows be walked together in ``max_depth``
+    vectorised steps. Leaf class distributions are kept as float32.
+    """
+
+    def __init__(self, model):
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        self.max_depth = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            nodes = np.arange(tree.node_count)
+            leaf = tree.children_left == -1
+
+            threshold = tree.threshold.astype(np.float32)
+            rounded_up = threshold.astype(np.float64) > tree.threshold
+            threshold[rounded_up] = np.nextafter(threshold[rounded_up], np.float32(-np.inf))
+            threshold[leaf] = np.inf
+
+            value = tree.value[:, 0, :].astype(np.float64)
+            normalizer = value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0] = 1.0
+
+            features.append(np.where(leaf, 0, tree.feature))
+            thresholds.append(threshold)
+            lefts.append(np.where(leaf, nodes, tree.children_left) + offset)
+            rights.append(np.where(leaf, nodes, tree.children_right) + offset)
+            values.append(value / normalizer)
+            roots.append(offset)
+            offset += tree.node_count
+            self.max_depth = max(self.max_depth, tree.max_depth)
+
+        self.feature = np.concatenate(features).astype(np.int32)
+        self.threshold = np.concatenate(thresholds)
+        self.left = np.concatenate(lefts).astype(np.int32)
+        self.right = np.concatenate(rights).astype(np.int32)
+        self.value = np.concatenate(values).astype(np.float32)
+        self.roots = np.array(roots, dtype=np.int32)
+        self.classes_ = model.classes_
+
+    @staticmethod
+    def supports(model):
+        return getattr(model, 'n_outputs_', None) == 1 and all(
+            hasattr(estimator, 'tree_') for estimator in getattr(model, 'estimators_', [None]))
+
+    def apply(self, X):
+        """Leaf index (into the packed arrays) of every row in every tree"""
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(len(X))[:, None]
+        nodes = np.broadcast_to(self.roots, (len(X), len(self.roots))).copy()
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    def predict_proba(self, X):
+        return self.value[self.apply(X)].sum(axis=1, dtype=np.float64) / len(self.roots)
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+    def probe_rows(self, rng, n_rows):
+        """Rows built from the split thresholds: exactly on a split, or anywhere in a feature's split range"""
+        split = self.threshold != np.inf
+        n_features = int(self.feature[split].max()) + 1 if split.any() else 1
+        probe = np.zeros((n_rows, n_features))
+        for feature in np.unique(self.feature[split]):
+            feature_thresholds = self.threshold[split & (self.feature == feature)].astype(np.float64)
+            on_split = rng.choice(feature_thresholds, size=n_rows)
+            in_range = rng.uniform(feature_thresholds.min(), feature_thresholds.max(), size=n_rows)
+            probe[:, feature] = np.where(rng.random(n_rows) < 0.3, on_split, in_range)
+        return probe
+
+
+def compact_model(model):
+    """Compact equivalent of a fitted model, or None if the model type isn't supported"""
+    model_name = type(model).__name__
+    if model_name == 'KNeighborsClassifier' and CompactKNN.supports(model):
+        return CompactKNN(model)
+    if model_name in ('RandomForestClassifier', 'ExtraTreesClassifier') and CompactForest.supports(model):
+        return CompactForest(model)
+    return None
+
+
+def build_compact_model(model, n_probe=256, random_state=0):
+    """
+    Prune diagnostic attributes, then compact the model and check it on probe
+    rows. Returns (model_to_use, agreement): the compact model when every probe
+    prediction matches, else the (pruned) original and None / the agreement seen.
+    """
+    prune_attributes(model)
+    try:
+        compact = compact_model(model)
+    except Exception as e:
+        logger.warning(f"Could not compact {type(model).__name__}: {e}")
+        return model, None
+    if compact is None:
+        return model, None
+
+    rng = np.random.default_rng(random_state)
+    probe = compact.probe_rows(rng, n_probe)
+    n_features = getattr(model, 'n_features_in_', probe.shape[1])
+    if probe.shape[1] < n_features:
+        probe = np.pad(probe, ((0, 0), (0, n_features - probe.shape[1])))
+
+    agreement = float(np.mean(model.predict(probe) == compact.predict(probe)))
+    if agreement < 1.0:
+        logger.warning(f"Compact {type(model).__name__} agreed on {agreement:.2%} of probe rows; keeping original")
+        return model, agreement
+    return compact, agreement
@@ -1,52 +1,54 @@
-import socket
 import os
-import requests
 from typing import Optional
+from discovery import EndpointDiscovery, resolve_local_ip, resolve_public_ip, resolve_ngrok_url
 
 class Config:
     """Centralized configuration for the ECG Model System"""
     
     def __init__(self):
-        self._local_ip = None
-        self._public_ip = None
-        self._ngrok_url = None
+        self._discovery = None
         
+    @property
+    def discovery(self) -> EndpointDiscovery:
+        """Background endpoint discovery (created on first use, so importing config never touches the network)"""
+        if self._discovery is None:
+            self._discovery = EndpointDiscovery(
+                resolvers={
+                    "local_ip": resolve_local_ip,
+                    "public_ip": resolve_public_ip,
+                    "ngrok_url": lambda: resolve_ngrok_url(self.NGROK_API_PORT)
+                },
+                ttl_seconds=self.DISCOVERY_TTL_SECONDS,
+                cache_path=self.DISCOVERY_CACHE_PATH,
+                offline=self.OFFLINE_MODE,
+                offline_keys=["local_ip"],
+                clear_on_failure=["ngrok_url"]
+            )
+        return self._discovery
+    
     @property
     def local_ip(self) -> str:
-        """Get local IP address"""
-        if self._local_ip is None:
-            try:
-                # Get local IP by connecting to a remote address
-                with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
-                    s.connect(("8.8.8.8", 80))
-                    self._local_ip = s.getsockname()[0]
-            except Exception:
-                self._local_ip = "127.0.0.1"
-        return self._local_ip
+        """Get local IP address (127.0.0.1 until discovery has resolved it)"""
+        return self.discovery.get("local_ip") or "127.0.0.1"
     
     @property
     def public_ip(self) -> str:
-        """Get public IP address"""
-        if self._public_ip is None:
-            try:
-                response = requests.get("https://api.ipify.org", timeout=5)
-                self._public_ip = response.text
-            except Exception:
-                self._public_ip = self.local_ip
-        return self._public_ip
+        """Get public IP address (the local IP when offline or not yet resolved)"""
+        return self.discovery.get("public_ip") or self.local_ip
     
     @property
     def ngrok_url(self) -> Optional[str]:
         """Get ngrok URL if available"""
-        if self._ngrok_url is None:
-            try:
-                response = requests.get("http://localhost:4040/api/tunnels", timeout=2)
-                data = response.json()
-                if data.get("tunnels"):
-                    self._ngrok_url = data["tunnels"][0]["public_url"]
-            except Exception:
-                self._ngrok_url = None
-        return self._ngrok_url
+        return self.discovery.get("ngrok_url")
+    
+    # Endpoint discovery: ECG_OFFLINE=1 skips the public IP and ngrok lookups entirely.
+    # Values are cached on disk and served (even when expired) while a background refresh runs.
+    OFFLINE_MODE = os.environ.get("ECG_OFFLINE", "0") == "1"
+    DISCOVERY_CACHE_PATH = os.environ.get(
+        "ECG_DISCOVERY_CACHE",
+        os.path.join(os.path.expanduser("~"), ".cache", "ecg-model-system", "endpoints.json")
+    )
+    DISCOVERY_TTL_SECONDS = {"local_ip": 300, "public_ip": 3600, "ngrok_url": 60}
     
     # Ports
     RECEIVER_PORT = 5000
@@ -119,6 +121,16 @@ class Config:
         """Get receiver results endpoint"""
         return f"{self.receiver_local_url}/get_results"
     
+    @property
+    def receiver_shard_urls(self) -> list:
+        """Get local receiver shard URLs for a sharded deployment"""
+        return [f"http://localhost:{self.SHARD_BASE_PORT + index}" for index in range(self.SHARD_COUNT)]
+    
+    @property
+    def receiver_stream_endpoint(self) -> str:
+        """Get receiver streaming ingest endpoint"""
+        return f"{self.receiver_local_url}/stream"
+    
     # Data transmission settings
     DATA_INTERVAL_SECONDS = 1
     CSV_FILE_PATH = "exported_data.csv"
@@ -127,18 +139,72 @@ class Config:
     COMPRESSED_FEATURES = 667
     STANDARD_FEATURES = 187
     
+    # Fold StandardScaler into SVM / logistic regression at load time
+    USE_FUSED_INFERENCE = True
+    
+    # Replace KNN / random forest models with verified compact equivalents at load time (see model_memory.py)
+    COMPACT_MODELS = False
+    COMPACT_PROBE_ROWS = 256
+    
+    # Inference scheduling ("ensemble" runs every model, "cascade" stops at the first confident one)
+    INFERENCE_MODE = "ensemble"
+    CASCADE_ORDER = ["logistic_regression", "xgboost", "svm", "random_forest", "knn"]
+    CASCADE_MARGIN_THRESHOLD = 0.5
+    CASCADE_AUDIT_RATE = 0.05
+    
+    # Admission control (deadline stays below the relay's FirebaseConfig.TIMEOUT of 30 s)
+    ADMISSION_WORKERS = 2
+    MAX_QUEUE_DEPTH = 64
+    REQUEST_DEADLINE_SECONDS = 25
+    NORMAL_CLASS = 0
+    ABNORMAL_PRIORITY_SECONDS = 60
+    
+    # Model worker processes fed through a shared-memory ring (0 runs models on the request thread)
+    INFERENCE_WORKERS = 0
+    SHM_RING_SLOTS = 64
+    SHM_SLOT_ROWS = 8
+    
+    # Traffic capture (None disables; see replay.py)
+    RECORD_TRAFFIC_PATH = None
+    
+    # Sharded deployment: router.py listens on RECEIVER_PORT and consistent-hashes
+    # device ids onto SHARD_COUNT receivers on consecutive ports from SHARD_BASE_PORT
+    SHARD_COUNT = 3
+    SHARD_BASE_PORT = 5101
+    SHARD_VIRTUAL_NODES = 64
+    SHARD_HEALTH_INTERVAL = 2
+    SHARD_HEALTH_TIMEOUT = 1
+    SHARD_REQUEST_TIMEOUT = 30
+    
+    # Streaming settings
+    DEVICE_ID = "ecg-device-1"
+    STREAM_WINDOW_SIZE = 187
+    STREAM_HOP_SIZE = 94
+    STREAM_SAMPLE_RATE_HZ = 125
+    STREAM_CHUNK_SAMPLES = 25
+    
     # Logging
     LOG_LEVEL = "INFO"
     LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+    LOG_JSON = False              # one JSON object per record instead of LOG_FORMAT
+    LOG_SAMPLE_RATE = 1.0         # fraction of INFO/DEBUG records kept
+    LOG_MAX_PER_SECOND = 5        # per message template; WARNING and above are never limited
+    
+    def _discovery_note(self, name) -> str:
+        if self.OFFLINE_MODE and name != "local_ip":
+            return " (offline mode)"
+        if not self.discovery.is_resolved(name):
+            return " (resolving...)"
+        return ""
     
     def print_config(self):
         """Print current configuration"""
         print("=" * 60)
         print("🔧 ECG Model System Configuration")
         print("=" * 60)
-        print(f"🌐 Local IP: {self.local_ip}")
-        print(f"🌍 Public IP: {self.public_ip}")
-        print(f"🔗 Ngrok URL: {self.ngrok_url or 'Not available'}")
+        print(f"🌐 Local IP: {self.local_ip}{self._discovery_note('local_ip')}")
+        print(f"🌍 Public IP: {self.public_ip}{self._discovery_note('public_ip')}")
+        print(f"🔗 Ngrok URL: {self.ngrok_url or 'Not available'}{self._discovery_note('ngrok_url')}")
         print()
         print("📡 URLs:")
         print(f"   Receiver (Local): {self.receiver_local_url}")
@@ -159,10 +225,13 @@ class Config:
         print(f"   Firebase Test: {self.firebase_test_endpoint}")
         print(f"   Receiver Health: {self.receiver_health_endpoint}")
         print(f"   Receiver Results: {self.receiver_results_endpoint}")
+        print(f"   Receiver Stream: {self.receiver_stream_endpoint}")
         print("=" * 60)
 
 # Global configuration instance
 config = Config()
 
 if __name__ == "__main__":
+    # Standalone use: give discovery a moment so the printout shows real values
+    config.discovery.wait(timeout=6)
     config.print_config()
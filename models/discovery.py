@@ -0,0 +1,157 @@
+import json
+import os
+import socket
+import threading
+import time
+
+
+def resolve_local_ip():
+    """Local IP of the default route (a UDP connect sends no packets)"""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.connect(("8.8.8.8", 80))
+        return s.getsockname()[0]
+
+
+def resolve_public_ip():
+    import requests
+    response = requests.get("https://api.ipify.org", timeout=5)
+    response.raise_for_status()
+    return response.text.strip()
+
+
+def resolve_ngrok_url(api_port=4040):
+    import requests
+    response = requests.get(f"http://localhost:{api_port}/api/tunnels", timeout=2)
+    tunnels = response.json().get("tunnels")
+    return tunnels[0]["public_url"] if tunnels else None
+
+
+class EndpointDiscovery:
+    """
+    Resolves endpoints (local IP, public IP, ngrok URL) in a background thread
+
+    Lookups never block: they return the last known value, from memory or the
+    on-disk cache (even if its TTL has expired), or None, and kick off a
+    background refresh when the value is missing or stale. In offline mode
+    only the local IP is resolved (a UDP connect involves no network traffic).
+    """
+
+    def __init__(self, resolvers, ttl_seconds, cache_path=None, offline=False, offline_keys=(), retry_seconds=30,
+                 clear_on_failure=()):
+        """
+        Initialize endpoint discovery
+
+        Args:
+            resolvers: {name: callable} returning the value (or raising)
+            ttl_seconds: {name: seconds} before a cached value is refreshed
+            cache_path: JSON file shared between processes and restarts (None disables)
+            offline: Skip every resolver not listed in offline_keys
+            offline_keys: Resolvers that still run in offline mode
+            retry_seconds: Delay before a failed lookup is retried (instead of its TTL)
+            clear_on_failure: Resolvers whose last value is dropped, not kept, when a lookup
+                              fails (a stopped ngrok refuses connections: its old URL is dead)
+        """
+        self.resolvers = resolvers
+        self.ttl_seconds = ttl_seconds
+        self.cache_path = cache_path
+        self.offline = offline
+        self.offline_keys = set(offline_keys)
+        self.retry_seconds = retry_seconds
+        self.clear_on_failure = set(clear_on_failure)
+
+        self._values = {}
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._done = threading.Event()
+        self._load_cache()
+
+    def _load_cache(self):
+        if not self.cache_path:
+            return
+        try:
+            with open(self.cache_path) as f:
+                cached = json.load(f)
+            self._values = {
+                name: (entry['value'], entry['resolved_at'], entry.get('failed', False))
+                for name, entry in cached.items() if name in self.resolvers
+            }
+        except (OSError, ValueError, KeyError, TypeError):
+            self._values = {}
+
+    def _save_cache(self):
+        if not self.cache_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+            with self._lock:
+                data = {name: {'value': value, 'resolved_at': resolved_at, 'failed': failed}
+                        for name, (value, resolved_at, failed) in self._values.items()}
+            # Write then rename so concurrent starts never read a partial file
+            temp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.cache_path)
+        except OSError:
+            pass
+
+    def _enabled(self, name):
+        return not self.offline or name in self.offline_keys
+
+    def _stale(self, name, now):
+        entry = self._values.get(name)
+        if entry is None:
+            return True
+        _, resolved_at, failed = entry
+        return now - resolved_at > (self.retry_seconds if failed else self.ttl_seconds.get(name, 0))
+
+    def refresh(self):
+        """Start a background refresh of missing or expired values (no-op if one is running)"""
+        now = time.time()
+        with self._lock:
+            pending = [name for name in self.resolvers if self._enabled(name) and self._stale(name, now)]
+            if self._refreshing:
+                return
+            if not pending:
+                # Only when idle: a running refresh sets it once the cache file is written
+                self._done.set()
+                return
+            self._refreshing = True
+            self._done.clear()
+        threading.Thread(target=self._refresh, args=(pending,), name="endpoint-discovery", daemon=True).start()
+
+    def _refresh(self, names):
+        try:
+            for name in names:
+                try:
+                    value, failed = self.resolvers[name](), False
+                except Exception:
+                    value, failed = None, True
+                with self._lock:
+                    # A failed lookup keeps the last good value (unless it is in
+                    # clear_on_failure) and is retried after retry_seconds, not on every call
+                    if failed and name not in self.clear_on_failure:
+                        value = self._values.get(name, (None,))[0]
+                    self._values[name] = (value, time.time(), failed)
+            self._save_cache()
+        finally:
+            with self._lock:
+                self._refreshing = False
+            self._done.set()
+
+    def get(self, name):
+        """Last known value (possibly None) without blocking"""
+        if not self._enabled(name):
+            return None
+        self.refresh()
+        with self._lock:
+            entry = self._values.get(name)
+        return entry[0] if entry else None
+
+    def is_resolved(self, name):
+        with self._lock:
+            return name in self._values
+
+    def wait(self, timeout=None):
+        """Block until the current refresh finishes (for tools that want fresh values)"""
+        self.refresh()
+        return self._done.wait(timeout)
@@ -70,6 +70,19 @@ exports.processNonCompressed = functions.https.onRequest((request, response) =>
     } catch (error) {
       console.error('Error processing non-compressed data:', error.message);
       
+      // Pass receiver load shedding through so the sender can back off
+      if (error.response && (error.response.status === 429 || error.response.status === 503)) {
+        const retryAfter = error.response.headers['retry-after'];
+        if (retryAfter) {
+          response.set('Retry-After', retryAfter);
+        }
+        return response.status(error.response.status).json({
+          success: false,
+          error: 'Receiver overloaded',
+          details: error.response.data
+        });
+      }
+
       // Check if it's a receiver connection error
       if (error.code === 'ECONNREFUSED' || error.code === 'ENOTFOUND') {
         return response.status(503).json({
@@ -150,6 +163,19 @@ exports.processCompressed = functions.https.onRequest((request, response) => {
     } catch (error) {
       console.error('Error processing compressed data:', error.message);
       
+      // Pass receiver load shedding through so the sender can back off
+      if (error.response && (error.response.status === 429 || error.response.status === 503)) {
+        const retryAfter = error.response.headers['retry-after'];
+        if (retryAfter) {
+          response.set('Retry-After', retryAfter);
+        }
+        return response.status(error.response.status).json({
+          success: false,
+          error: 'Receiver overloaded',
+          details: error.response.data
+        });
+      }
+
       // Check if it's a receiver connection error
       if (error.code === 'ECONNREFUSED' || error.code === 'ENOTFOUND') {
         return response.status(503).json({
@@ -0,0 +1,228 @@
+import logging
+from functools import lru_cache
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _scaler_affine(scaler, n_features):
+    """(inv_scale, offset) such that scaler.transform(X) == X * inv_scale - offset"""
+    mean = getattr(scaler, 'mean_', None)
+    scale = getattr(scaler, 'scale_', None)
+    inv_scale = np.ones(n_features) if scale is None else 1.0 / scale
+    mean = np.zeros(n_features) if mean is None else mean
+    return inv_scale, mean * inv_scale
+
+
+def _softmax(scores):
+    scores = scores - scores.max(axis=1, keepdims=True)
+    np.exp(scores, out=scores)
+    scores /= scores.sum(axis=1, keepdims=True)
+    return scores
+
+
+def _sigmoid(scores):
+    return 1.0 / (1.0 + np.exp(-scores))
+
+
+def _pipeline_proba(scaler, model):
+    """predict_proba of the original scaler + model; only built when the model really has one,
+    since the closure keeps the original model and scaler resident"""
+    return lambda X: model.predict_proba(scaler.transform(X))
+
+
+class FusedLinearModel:
+    """
+    StandardScaler folded into a linear model: predictions are a single
+    ``X @ coef.T + intercept`` on unscaled rows.
+
+    Used for LogisticRegression, LinearSVC and SVC(kernel='linear').
+    """
+
+    def __init__(self, scaler, model, coef, intercept, ovo=False):
+        inv_scale, offset = _scaler_affine(scaler, coef.shape[1])
+        # coef @ (X * inv_scale - offset) == (coef * inv_scale) @ X - coef @ offset
+        self.coef_ = coef * inv_scale
+        self.intercept_ = intercept - coef @ offset
+        self.classes_ = model.classes_
+        self.ovo = ovo
+
+        if type(model).__name__ == 'LogisticRegression':
+            multi_class = getattr(model, 'multi_class', 'auto')
+            self._ovr_proba = multi_class == 'ovr' or getattr(model, 'solver', None) == 'liblinear'
+            self.predict_proba = self._predict_proba
+        elif hasattr(model, 'predict_proba'):
+            # Platt-scaled SVC probabilities: keep the original pipeline for them
+            # (the probability parameter can't be trusted: newer sklearn defaults it to 'deprecated')
+            self.predict_proba = _pipeline_proba(scaler, model)
+
+    def decision_function(self, X):
+        scores = np.asarray(X) @ self.coef_.T + self.intercept_
+        return scores.ravel() if scores.shape[1] == 1 else scores
+
+    def predict(self, X):
+        scores = self.decision_function(X)
+        if scores.ndim == 1:
+            return self.classes_[(scores > 0).astype(int)]
+        if self.ovo:
+            return self.classes_[_ovo_votes(scores, len(self.classes_))]
+        return self.classes_[scores.argmax(axis=1)]
+
+    def _predict_proba(self, X):
+        scores = self.decision_function(X)
+        if scores.ndim == 1:
+            positive = _sigmoid(scores)
+            return np.column_stack((1 - positive, positive))
+        if self._ovr_proba:
+            proba = _sigmoid(scores)
+            return proba / proba.sum(axis=1, keepdims=True)
+        return _softmax(scores)
+
+
+@lru_cache(maxsize=None)
+def _ovo_pairs(n_classes):
+    """(first, second) class index of every one-vs-one pair, in libsvm order"""
+    pairs = [(i, j) for i in range(n_classes) for j in range(i + 1, n_classes)]
+    return np.array([i for i, _ in pairs]), np.array([j for _, j in pairs]), np.arange(n_classes)
+
+
+def _ovo_votes(decisions, n_classes):
+    """libsvm one-vs-one voting; ties go to the lowest class index"""
+    first, second, classes = _ovo_pairs(n_classes)
+    winners = np.where(decisions > 0, first, second)
+    votes = (winners[:, :, None] == classes).sum(axis=1)
+    return votes.argmax(axis=1)
+
+
+class FusedKernelSVM:
+    """
+    SVC with the scaler folded into the support vectors and float32 kernel evaluation
+
+    The scaler is folded into the support vectors once, so each row only needs
+    an element-wise multiply. For RBF the support-vector norms are precomputed
+    and distances come from a single float32 matrix product. The
+    one-vs-one dual coefficients are laid out as one (n_SV, n_pairs) matrix so
+    every pairwise decision is computed by one more product.
+    """
+
+    def __init__(self, scaler, model):
+        self.kernel = model.kernel
+        self.gamma = np.float32(model._gamma)
+        self.coef0 = np.float32(model.coef0)
+        self.degree = model.degree
+        self.classes_ = model.classes_
+
+        support_vectors = np.asarray(model.support_vectors_, dtype=np.float64)
+        inv_scale, offset = _scaler_affine(scaler, support_vectors.shape[1])
+        self.inv_scale = inv_scale.astype(np.float32)
+        if self.kernel == 'rbf':
+            # (X * inv_scale - offset) - sv == X * inv_scale - (sv + offset)
+            self.support_vectors = (support_vectors + offset).astype(np.float32)
+            self.sv_sq_norms = np.einsum('ij,ij->i', self.support_vectors, self.support_vectors)
+        else:
+            # (X * inv_scale - offset) . sv == (X * inv_scale) . sv - offset . sv
+            self.support_vectors = support_vectors.astype(np.float32)
+            self.sv_offset = (support_vectors @ offset).astype(np.float32)
+
+        self.pair_coef, self.intercept = self._pairwise_coefficients(model)
+
+        if hasattr(model, 'predict_proba'):
+            # Platt-scaled probabilities: keep the original pipeline for them
+            self.predict_proba = _pipeline_proba(scaler, model)
+
+    @staticmethod
+    def _pairwise_coefficients(model):
+        """Dense (n_SV, n_pairs) dual coefficients in libsvm pair order"""
+        dual_coef = np.asarray(model.dual_coef_, dtype=np.float64)
+        n_classes = len(model.classes_)
+        if n_classes == 2:
+            return dual_coef.T.astype(np.float32), np.asarray(model.intercept_, dtype=np.float32)
+
+        starts = np.concatenate(([0], np.cumsum(model.n_support_)))
+        n_pairs = n_classes * (n_classes - 1) // 2
+        pair_coef = np.zeros((dual_coef.shape[1], n_pairs), dtype=np.float64)
+        pair = 0
+        for i in range(n_classes):
+            for j in range(i + 1, n_classes):
+                sv_i = slice(starts[i], starts[i + 1])
+                sv_j = slice(starts[j], starts[j + 1])
+                pair_coef[sv_i, pair] = dual_coef[j - 1, sv_i]
+                pair_coef[sv_j, pair] = dual_coef[i, sv_j]
+                pair += 1
+        return pair_coef.astype(np.float32), np.asarray(model.intercept_, dtype=np.float32)
+
+    def _kernel(self, X):
+        X = np.asarray(X, dtype=np.float32) * self.inv_scale
+        dot = X @ self.support_vectors.T
+        if self.kernel == 'rbf':
+            x_sq_norms = np.einsum('ij,ij->i', X, X)
+            dot *= -2
+            dot += x_sq_norms[:, None]
+            dot += self.sv_sq_norms
+            np.maximum(dot, 0, out=dot)
+            dot *= -self.gamma
+            return np.exp(dot, out=dot)
+        dot -= self.sv_offset
+        if self.kernel == 'poly':
+            return (self.gamma * dot + self.coef0) ** self.degree
+        return np.tanh(self.gamma * dot + self.coef0)
+
+    def decision_function(self, X):
+        decisions = self._kernel(X) @ self.pair_coef + self.intercept
+        return decisions.ravel() if decisions.shape[1] == 1 else decisions
+
+    def predict(self, X):
+        decisions = self.decision_function(X)
+        if decisions.ndim == 1:
+            return self.classes_[(decisions > 0).astype(int)]
+        return self.classes_[_ovo_votes(decisions, len(self.classes_))]
+
+
+def fuse_scaler_and_model(scaler, model):
+    """Build the fused equivalent of scaler + model, or None if the model type isn't supported"""
+    model_name = type(model).__name__
+    if model_name == 'LogisticRegression':
+        return FusedLinearModel(scaler, model, np.asarray(model.coef_), np.asarray(model.intercept_))
+    if model_name == 'LinearSVC':
+        return FusedLinearModel(scaler, model, np.asarray(model.coef_), np.asarray(model.intercept_))
+    if model_name == 'SVC':
+        if model.kernel == 'linear':
+            return FusedLinearModel(scaler, model, np.asarray(model.coef_), np.asarray(model.intercept_),
+                                    ovo=len(model.classes_) > 2)
+        if model.kernel in ('rbf', 'poly', 'sigmoid'):
+            return FusedKernelSVM(scaler, model)
+    return None
+
+
+def compare_with_pipeline(scaler, model, fused, X):
+    """Fraction of rows where the fused model predicts the same class as scaler + model"""
+    original = model.predict(scaler.transform(X))
+    return float(np.mean(original == fused.predict(X)))
+
+
+def build_fused_model(scaler, model, n_probe=256, random_state=0):
+    """
+    Fuse scaler + model and check it on probe rows drawn around the scaler's
+    training distribution. Returns None (keep the original pipeline) when the
+    model isn't supported or the fused predictions disagree.
+    """
+    try:
+        fused = fuse_scaler_and_model(scaler, model)
+    except Exception as e:
+        logger.warning(f"Could not fuse {type(model).__name__}: {e}")
+        return None
+    if fused is None:
+        return None
+
+    rng = np.random.default_rng(random_state)
+    n_features = scaler.n_features_in_
+    mean = getattr(scaler, 'mean_', None)
+    scale = getattr(scaler, 'scale_', None)
+    probe = rng.standard_normal((n_probe, n_features))
+    probe = probe * (1.0 if scale is None else scale) + (0.0 if mean is None else mean)
+
+    agreement = compare_with_pipeline(scaler, model, fused, probe)
+    if agreement < 1.0:
+        logger.warning(f"Fused {type(model).__name__} agreed on {agreement:.2%} of probe rows; keeping original pipeline")
+        return None
+    return fused
@@ -0,0 +1,161 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import time
+from config import config
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record; ``extra={'fields': {...}}`` adds structured fields"""
+
+    def format(self, record):
+        entry = {
+            'ts': record.created,
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'msg': record.getMessage()
+        }
+        fields = getattr(record, 'fields', None)
+        if fields:
+            entry.update(fields)
+        suppressed = getattr(record, 'suppressed', None)
+        if suppressed:
+            entry['suppressed'] = suppressed
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SuppressedCountFormatter(logging.Formatter):
+    """Plain text formatter that notes how many similar records were rate limited"""
+
+    def format(self, record):
+        message = super().format(record)
+        suppressed = getattr(record, 'suppressed', None)
+        if suppressed:
+            message += f" (+{suppressed} similar suppressed)"
+        return message
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Per-event sampling and rate limiting
+
+    The event key is the unformatted message template, so lazily formatted
+    calls (``logger.info("x=%s", x)``) share a key regardless of arguments.
+    Records at or above ``exempt_level`` always pass. Counters are updated
+    without a lock and may be slightly off under contention.
+    """
+
+    def __init__(self, sample_rate=1.0, max_per_second=None, exempt_level=logging.WARNING):
+        super().__init__()
+        self.sample_rate = sample_rate
+        self.max_per_second = max_per_second
+        self.exempt_level = exempt_level
+        self._windows = {}
+        self._swept_at = 0
+        self.dropped = 0
+
+    def filter(self, record):
+        if record.levelno >= self.exempt_level:
+            return True
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            self.dropped += 1
+            return False
+        if not self.max_per_second:
+            return True
+
+        key = (record.name, record.msg)
+        second = int(time.monotonic())
+        if second != self._swept_at:
+            self._sweep(second)
+        window = self._windows.get(key)
+        if window is None or window[0] != second:
+            suppressed = window[2] if window else 0
+            window = [second, 0, 0]
+            self._windows[key] = window
+            if suppressed:
+                record.suppressed = suppressed
+        window[1] += 1
+        if window[1] > self.max_per_second:
+            window[2] += 1
+            self.dropped += 1
+            return False
+        return True
+
+    def _sweep(self, second):
+        """
+        Forget windows from earlier seconds, so messages that are not templates
+        (f-strings, one key per distinct text) can't grow the table forever.
+        The suppressed count of a swept window is lost if its message doesn't
+        recur within the next second.
+        """
+        self._swept_at = second
+        # list() snapshots the items in one step, so concurrent inserts can't break the iteration
+        self._windows = {key: window for key, window in list(self._windows.items()) if window[0] >= second - 1}
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread
+
+    The stock handler formats the message on the calling thread before
+    enqueueing; here the record goes on the queue untouched, so arguments must
+    not be mutated after the logging call (true for the scalars and shapes
+    logged on the hot path).
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def build_queue_handler(stream=None, json_format=False, sample_rate=1.0, max_per_second=None):
+    """
+    Build a (handler, listener) pair: the handler filters and enqueues records
+    on the calling thread, the listener formats and writes them to ``stream``
+    (stderr by default) on a background thread. The listener is not started.
+    """
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JsonFormatter() if json_format else SuppressedCountFormatter(config.LOG_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    handler = DeferredQueueHandler(log_queue)
+    handler.addFilter(SamplingFilter(sample_rate, max_per_second))
+    listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    return handler, listener
+
+
+def setup_logging(level=None, json_format=None, stream=None):
+    """
+    Route all logging through a background queue listener
+
+    Safe to call more than once; only the first call configures logging.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    handler, _listener = build_queue_handler(
+        stream,
+        config.LOG_JSON if json_format is None else json_format,
+        config.LOG_SAMPLE_RATE,
+        config.LOG_MAX_PER_SECOND
+    )
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level or config.LOG_LEVEL)
+
+    _listener.start()
+    # Flush whatever is still queued on interpreter exit
+    atexit.register(_listener.stop)
+    return _listener
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Memory used by the loaded models, and the optional compaction step
+
+Per-model sizes count the array / raw buffer payload reachable from each
+model (numpy arrays, sklearn tree nodes, XGBoost boosters), which is what
+dominates resident memory. Run standalone to print the report for the
+receiver's models before and after compaction, and optionally export the
+compacted artifacts:
+
+    python3 model_memory.py
+    python3 model_memory.py --export compact_models/
+"""
+
+import argparse
+import os
+import numpy as np
+
+
+def model_bytes(obj, seen=None):
+    """Approximate payload bytes reachable from obj (each object counted once)"""
+    # id -> object: holding on to the object keeps temporary __getstate__ results
+    # alive, so their ids can't be reused by a later, different object
+    seen = {} if seen is None else seen
+    if id(obj) in seen or obj is None or isinstance(obj, (int, float, str, bool, type)):
+        return 0
+    seen[id(obj)] = obj
+
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return len(obj)
+    if isinstance(obj, dict):
+        return sum(model_bytes(value, seen) for value in obj.values())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sum(model_bytes(item, seen) for item in obj)
+    if callable(obj) and getattr(obj, '__closure__', None):
+        # e.g. the predict_proba fallback of a fused model keeps its original pipeline alive
+        return sum(model_bytes(cell.cell_contents, seen) for cell in obj.__closure__)
+    if _overrides_getstate(obj) or not hasattr(obj, '__dict__'):
+        # Types that pickle themselves expose their real payload this way: extension
+        # types (sklearn Tree, KD trees) and XGBoost's Booster, whose __dict__ only
+        # holds a ctypes handle while __getstate__ returns the raw model bytes
+        try:
+            return model_bytes(obj.__getstate__(), seen)
+        except Exception:
+            pass
+    if hasattr(obj, '__dict__'):
+        return model_bytes(vars(obj), seen)
+    return 0
+
+
+def _overrides_getstate(obj):
+    getstate = getattr(type(obj), '__getstate__', None)
+    return getstate is not None and getstate is not getattr(object, '__getstate__', None)
+
+
+def process_memory(pid='self'):
+    """Resident and peak resident set size of a process in bytes (Linux /proc; None elsewhere)"""
+    fields = {'VmRSS': 'rss_bytes', 'VmHWM': 'peak_rss_bytes'}
+    memory = {name: None for name in fields.values()}
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                if key in fields:
+                    memory[fields[key]] = int(value.split()[0]) * 1024
+    except OSError:
+        pass
+    return memory
+
+
+def memory_report(model_sets):
+    """
+    Per-model bytes for {set_name: {name: (scaler, model)}} plus the process RSS
+
+    Objects shared between models are only counted once in the total.
+    """
+    seen = {}
+    models = {}
+    total = 0
+    for set_name, model_set in model_sets.items():
+        models[set_name] = {}
+        for name, (scaler, model) in model_set.items():
+            model_size = model_bytes(model)
+            scaler_size = model_bytes(scaler)
+            total += model_bytes(model, seen) + model_bytes(scaler, seen)
+            models[set_name][name] = {
+                'type': type(model).__name__,
+                'bytes': model_size,
+                'scaler_bytes': scaler_size
+            }
+    return {'models': models, 'total_model_bytes': total, 'process': process_memory()}
+
+
+def compact_model_sets(model_sets, n_probe=256):
+    """
+    Replace models in place with verified compact equivalents (see compact_models)
+
+    Returns one entry per model that was looked at, with its size before and
+    after and the probe agreement (None when the type has no compact form).
+    """
+    from compact_models import build_compact_model
+
+    results = []
+    for set_name, model_set in model_sets.items():
+        for name, (scaler, model) in model_set.items():
+            before = model_bytes(model)
+            model_type = type(model).__name__
+            compact, agreement = build_compact_model(model, n_probe=n_probe)
+            model_set[name] = (scaler, compact)
+            results.append({
+                'set': set_name,
+                'model': name,
+                'type': model_type,
+                'compact_type': type(compact).__name__,
+                'bytes_before': before,
+                'bytes_after': model_bytes(compact),
+                'agreement': agreement
+            })
+    return results
+
+
+def _megabytes(size):
+    return f"{size / 1e6:8.2f} MB" if size is not None else "     n/a"
+
+
+def print_report(report):
+    for set_name, models in report['models'].items():
+        for name, entry in models.items():
+            print(f"   {set_name:<9} {name:<20} {entry['type']:<24} {_megabytes(entry['bytes'] + entry['scaler_bytes'])}")
+    print(f"   {'total (shared objects counted once)':<55} {_megabytes(report['total_model_bytes'])}")
+    print(f"   {'process RSS':<55} {_megabytes(report['process']['rss_bytes'])}")
+
+
+if __name__ == "__main__":
+    import joblib
+    from config import config
+    from fused_models import FusedLinearModel, FusedKernelSVM
+    from receiver import ModelReceiver, MODEL_FILE_SUFFIXES
+
+    parser = argparse.ArgumentParser(description="Model memory report and compaction")
+    parser.add_argument('--export', default=None,
+                        help="Write the compacted models to this directory under their original file names")
+    parser.add_argument('--probe-rows', type=int, default=config.COMPACT_PROBE_ROWS)
+    args = parser.parse_args()
+
+    config.COMPACT_MODELS = False
+    receiver = ModelReceiver.inference_only()
+    print("Loaded models")
+    print_report(memory_report(receiver.model_sets))
+
+    results = compact_model_sets(receiver.model_sets, n_probe=args.probe_rows)
+    print("\nCompaction")
+    for result in results:
+        agreement = "not supported" if result['agreement'] is None else f"agreement {result['agreement']:.2%}"
+        print(f"   {result['set']:<9} {result['model']:<20} {_megabytes(result['bytes_before'])} ->"
+              f" {_megabytes(result['bytes_after'])}  {result['compact_type']} ({agreement})")
+
+    print("\nAfter compaction")
+    print_report(memory_report(receiver.model_sets))
+
+    if args.export:
+        os.makedirs(args.export, exist_ok=True)
+        for result in results:
+            _, model = receiver.model_sets[result['set']][result['model']]
+            # Fused models replace scaler + model, so they can't stand in for a plain model file
+            if isinstance(model, (FusedLinearModel, FusedKernelSVM)):
+                continue
+            path = os.path.join(args.export, f"{result['model']}_model{MODEL_FILE_SUFFIXES[result['set']]}.joblib")
+            joblib.dump(model, path)
+            print(f"Wrote {path}")
@@ -0,0 +1,222 @@
+import itertools
+import logging
+import multiprocessing as mp
+import threading
+import time
+import numpy as np
+from shm_transport import SharedRingBuffer, Empty
+from model_memory import process_memory
+
+logger = logging.getLogger(__name__)
+
+MODEL_TYPES = ["non_compressed", "decompressed", "zlib"]
+MODES = [None, "ensemble", "cascade"]
+
+
+def _encode_tag(model_type, mode):
+    return MODEL_TYPES.index(model_type) * len(MODES) + MODES.index(mode)
+
+
+def _decode_tag(tag):
+    return MODEL_TYPES[tag // len(MODES)], MODES[tag % len(MODES)]
+
+
+def _worker_main(ring, result_queue, claims, index, stats_interval=1.0):
+    """
+    Model execution process: read rows from the ring, run the models, send results back
+
+    ``claims[2 * index]`` / ``claims[2 * index + 1]`` hold the ticket and request
+    id being worked on (-1 when idle), so the parent can release the slot and
+    fail the request if this process dies. Cascade statistics go back as
+    ``('stats', index, snapshot)`` at most every ``stats_interval`` seconds
+    while busy, and as soon as the worker goes idle.
+    """
+    from receiver import ModelReceiver
+    from model_memory import memory_report
+
+    receiver = ModelReceiver.inference_only()
+    # Model sizes are fixed once loaded (and compacted), so they're reported once, with 'ready'
+    report = memory_report(receiver.model_sets)
+    report['compaction'] = receiver.compaction
+    result_queue.put(('ready', index, report))
+    stats_sent_at = 0.0
+    stats_changed = False
+    while True:
+        try:
+            ticket, request_id, tag, rows = ring.get(timeout=stats_interval)
+        except Empty:
+            if stats_changed:
+                result_queue.put(('stats', index, receiver.cascade_stats.snapshot()))
+                stats_changed = False
+            continue
+        if request_id < 0:
+            ring.release(ticket)
+            return
+        claims[2 * index], claims[2 * index + 1] = ticket, request_id
+
+        model_type, mode = _decode_tag(tag)
+        try:
+            # Models copy/convert their input anyway, so they can read the shared view directly
+            results = [receiver.run_models_on_data(row, model_type, mode) for row in rows]
+            result_queue.put((request_id, results, None))
+        except Exception as e:
+            result_queue.put((request_id, None, f"{type(e).__name__}: {e}"))
+        finally:
+            ring.release(ticket)
+            claims[2 * index], claims[2 * index + 1] = -1, -1
+
+        stats_changed = True
+        if time.time() - stats_sent_at >= stats_interval:
+            result_queue.put(('stats', index, receiver.cascade_stats.snapshot()))
+            stats_sent_at = time.time()
+            stats_changed = False
+
+
+class ModelWorkerPool:
+    """
+    Model execution processes fed through a SharedRingBuffer
+
+    Feature rows go through shared memory; only the (small) result dicts come
+    back over a multiprocessing queue. A monitor thread restarts workers that
+    die (e.g. OOM-killed), releasing the slot they held and failing the
+    request they were running.
+    """
+
+    def __init__(self, workers, slots=64, max_rows=8, max_features=667, start_timeout=120):
+        """
+        Start the worker processes
+
+        Args:
+            workers: Number of model execution processes
+            slots: Ring buffer slots
+            max_rows: Rows per slot (largest batch)
+            max_features: Largest feature vector (667 for the zlib models)
+            start_timeout: Seconds to wait for every worker to load its models
+        """
+        # Spawn rather than fork: the HTTP process already runs logging and admission threads
+        ctx = mp.get_context('spawn')
+        self._ctx = ctx
+        self.ring = SharedRingBuffer(slots, max_rows, max_features, ctx=ctx)
+        self.max_rows = max_rows
+        self._results = ctx.Queue()
+        self._request_ids = itertools.count(1)
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._claims = ctx.Array('q', [-1] * (2 * workers), lock=False)
+        self._closing = False
+        self.model_reports = {}  # worker index -> memory_report of its models (plus 'compaction')
+        self.cascade_snapshots = {}  # worker index -> latest CascadeStats snapshot
+        self.retired_cascade_snapshots = []  # last snapshots of workers that were restarted
+
+        self.processes = [self._start_worker(index) for index in range(workers)]
+        for _ in self.processes:
+            status, index, report = self._results.get(timeout=start_timeout)
+            if status != 'ready':
+                raise RuntimeError("Model worker failed to start")
+            self.model_reports[index] = report
+        logger.info(f"Started {workers} model worker processes (ring: {slots} slots x {max_rows} rows)")
+
+        threading.Thread(target=self._dispatch_results, name="model-worker-results", daemon=True).start()
+        threading.Thread(target=self._monitor_workers, name="model-worker-monitor", daemon=True).start()
+
+    def _start_worker(self, index):
+        process = self._ctx.Process(target=_worker_main, args=(self.ring, self._results, self._claims, index),
+                                    name=f"model-worker-{index}", daemon=True)
+        process.start()
+        return process
+
+    def _complete(self, request_id, results, error):
+        with self._pending_lock:
+            pending = self._pending.pop(request_id, None)
+        if pending is not None:
+            pending[1] = results
+            pending[2] = error
+            pending[0].set()
+
+    def _dispatch_results(self):
+        while True:
+            request_id, results, error = self._results.get()
+            if request_id == 'ready':
+                # A restarted worker: ('ready', index, report); keep what its predecessor counted
+                self.model_reports[results] = error
+                previous = self.cascade_snapshots.pop(results, None)
+                if previous is not None:
+                    self.retired_cascade_snapshots.append(previous)
+                continue
+            if request_id == 'stats':
+                # ('stats', index, snapshot)
+                self.cascade_snapshots[results] = error
+                continue
+            self._complete(request_id, results, error)
+
+    def _monitor_workers(self, interval=0.5):
+        """Replace dead workers; their claimed slot goes back to the ring and their request fails"""
+        while not self._closing:
+            for index, process in enumerate(self.processes):
+                if process.is_alive() or self._closing:
+                    continue
+                ticket, request_id = self._claims[2 * index], self._claims[2 * index + 1]
+                self._claims[2 * index], self._claims[2 * index + 1] = -1, -1
+                if ticket >= 0:
+                    self.ring.release(ticket)
+                if request_id >= 0:
+                    self._complete(request_id, None, f"{process.name} exited with code {process.exitcode}")
+                logger.error("Model worker %s exited with code %s; restarting it", process.name, process.exitcode)
+                self.processes[index] = self._start_worker(index)
+            time.sleep(interval)
+
+    def run_batch(self, rows, model_type="non_compressed", mode=None, timeout=None):
+        """
+        Run the models on up to max_rows rows in worker processes; returns one result dict per row
+
+        ``timeout`` covers both waiting for a free slot and for the result
+        (raises Full / TimeoutError).
+        """
+        rows = np.asarray(rows)
+        if rows.ndim == 1:
+            rows = rows.reshape(1, -1)
+
+        request_id = next(self._request_ids)
+        pending = [threading.Event(), None, None]
+        with self._pending_lock:
+            self._pending[request_id] = pending
+        deadline = None if timeout is None else time.time() + timeout
+        try:
+            self.ring.put(rows, request_id, _encode_tag(model_type, mode), timeout=timeout)
+            remaining = None if deadline is None else max(0.0, deadline - time.time())
+            if not pending[0].wait(remaining):
+                raise TimeoutError(f"No result from model workers within {timeout} seconds")
+        finally:
+            with self._pending_lock:
+                self._pending.pop(request_id, None)
+
+        if pending[2] is not None:
+            raise RuntimeError(f"Model worker error: {pending[2]}")
+        return pending[1]
+
+    def run(self, data, model_type="non_compressed", mode=None, timeout=None):
+        """Run the models on a single row in a worker process"""
+        return self.run_batch(data, model_type, mode, timeout)[0]
+
+    def memory_reports(self):
+        """Per worker: pid, current RSS and the model sizes / compaction results it reported at startup"""
+        reports = []
+        for index, process in enumerate(self.processes):
+            report = dict(self.model_reports.get(index) or {})
+            report['pid'] = process.pid
+            report['process'] = process_memory(process.pid)
+            reports.append(report)
+        return reports
+
+    def cascade_stats_snapshots(self):
+        """Latest cascade statistics snapshot of every worker, including workers since restarted"""
+        return self.retired_cascade_snapshots + list(self.cascade_snapshots.values())
+
+    def close(self):
+        """Stop the workers and free the shared memory"""
+        self._closing = True
+        for _ in self.processes:
+            self.ring.put(np.zeros((1, 1), dtype=np.float32), request_id=-1)
+        for process in self.processes:
+            process.join(timeout=5)
+        self.ring.close()
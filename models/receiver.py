@@ -10,28 +10,51 @@ import pickle
 from datetime import datetime
 import joblib
 import base64
+import argparse
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from config import config
+from log_pipeline import setup_logging
+from streaming import StreamRegistry, parse_samples
+from traffic_recorder import TrafficRecorder, ENDPOINT_CODES
+from fused_models import build_fused_model
+from model_workers import ModelWorkerPool
+from model_memory import memory_report, compact_model_sets, process_memory
+from cascade import CascadeStats, prediction_margin, majority_vote
+from admission import (AdmissionController, AdmissionRejected, deadline_from_timestamp,
+                       PRIORITY_ABNORMAL, PRIORITY_NON_COMPRESSED, PRIORITY_COMPRESSED, PRIORITY_STREAM)
 
-# Configure logging
-logging.basicConfig(level=config.LOG_LEVEL, format=config.LOG_FORMAT)
+# Configure logging (background queue listener, sampled and rate limited)
+setup_logging()
 logger = logging.getLogger(__name__)
 
+# Artifact file name suffix per model set (e.g. knn_model_zlib.joblib)
+MODEL_FILE_SUFFIXES = {'standard': '', 'zlib': '_zlib'}
+
 class ModelReceiver:
-    def __init__(self, port=None):
+    def __init__(self, port=None, record_path=None):
         """
         Initialize the model receiver
         
         Args:
             port: Port for the Flask server (defaults to config)
+            record_path: Append incoming payloads to this traffic recording (defaults to config)
         """
         self.port = port or config.RECEIVER_PORT
         self.app = Flask(__name__)
         CORS(self.app)  # Enable CORS for frontend communication
         
-        # Load all models
-        self.load_models()
+        # Load all models in this process, or start model worker processes fed over shared memory
+        if config.INFERENCE_WORKERS:
+            self.worker_pool = ModelWorkerPool(
+                config.INFERENCE_WORKERS,
+                slots=config.SHM_RING_SLOTS,
+                max_rows=config.SHM_SLOT_ROWS,
+                max_features=max(config.COMPRESSED_FEATURES, config.STANDARD_FEATURES)
+            )
+        else:
+            self.worker_pool = None
+            self.load_models()
         
         # Setup routes
         self.setup_routes()
@@ -39,29 +62,60 @@ class ModelReceiver:
         # Results storage
         self.results_buffer = []
         self.results_lock = threading.Lock()
+        
+        # Per-device sliding window buffers for streaming ingest
+        self.streams = StreamRegistry(config.STREAM_WINDOW_SIZE, config.STREAM_HOP_SIZE)
+        
+        # Cascade scheduler statistics
+        self.cascade_stats = CascadeStats()
+        
+        # Bounded, deadline-aware ingress queue and recently abnormal devices (device_id -> expiry)
+        self.admission = AdmissionController(config.ADMISSION_WORKERS, config.MAX_QUEUE_DEPTH)
+        self.abnormal_devices = {}
+        
+        # Optional capture of incoming traffic for replay (see replay.py)
+        record_path = record_path or config.RECORD_TRAFFIC_PATH
+        self.recorder = TrafficRecorder(record_path) if record_path else None
+    
+    @classmethod
+    def inference_only(cls):
+        """Instance with the models loaded but no HTTP server or queues (used by model worker processes)"""
+        receiver = cls.__new__(cls)
+        receiver.worker_pool = None
+        receiver.cascade_stats = CascadeStats()
+        receiver.load_models()
+        return receiver
     
     def load_models(self):
         """Load all trained models and scalers"""
         try:
             logger.info("Loading models and scalers...")
             
-            # Non-compressed models
-            self.knn_model = joblib.load('knn_model.joblib')
-            self.random_forest_model = joblib.load('random_forest_model.joblib')
-            self.xgboost_model = joblib.load('xgboost_model.joblib')
-            self.svm_scaler = joblib.load('svm_scaler.joblib')
-            self.svm_model = joblib.load('svm_model.joblib')
-            self.logistic_scaler = joblib.load('logistic_regression_scaler.joblib')
-            self.logistic_model = joblib.load('logistic_regression_model.joblib')
-            
-            # Zlib models
-            self.knn_model_zlib = joblib.load('knn_model_zlib.joblib')
-            self.random_forest_model_zlib = joblib.load('random_forest_model_zlib.joblib')
-            self.xgboost_model_zlib = joblib.load('xgboost_model_zlib.joblib')
-            self.svm_scaler_zlib = joblib.load('svm_scaler_zlib.joblib')
-            self.svm_model_zlib = joblib.load('svm_model_zlib.joblib')
-            self.logistic_scaler_zlib = joblib.load('logistic_regression_scaler_zlib.joblib')
-            self.logistic_model_zlib = joblib.load('logistic_regression_model_zlib.joblib')
+            # (scaler, model) per model name, in ensemble reporting order. Models are only
+            # referenced from here so fusing / compaction can release the originals.
+            self.model_sets = {
+                set_name: {
+                    'knn': (None, joblib.load(f'knn_model{suffix}.joblib')),
+                    'random_forest': (None, joblib.load(f'random_forest_model{suffix}.joblib')),
+                    'xgboost': (None, joblib.load(f'xgboost_model{suffix}.joblib')),
+                    'svm': (joblib.load(f'svm_scaler{suffix}.joblib'),
+                            joblib.load(f'svm_model{suffix}.joblib')),
+                    'logistic_regression': (joblib.load(f'logistic_regression_scaler{suffix}.joblib'),
+                                            joblib.load(f'logistic_regression_model{suffix}.joblib'))
+                }
+                for set_name, suffix in MODEL_FILE_SUFFIXES.items()
+            }
+            
+            if config.USE_FUSED_INFERENCE:
+                self.fuse_scaled_models()
+            
+            self.compaction = []
+            if config.COMPACT_MODELS:
+                self.compaction = compact_model_sets(self.model_sets, n_probe=config.COMPACT_PROBE_ROWS)
+                for result in self.compaction:
+                    if result['compact_type'] != result['type']:
+                        logger.info(f"Using {result['compact_type']} for {result['set']} {result['model']}: "
+                                    f"{result['bytes_before'] / 1e6:.1f} MB -> {result['bytes_after'] / 1e6:.1f} MB")
             
             logger.info("All models loaded successfully")
             
@@ -69,6 +123,17 @@ class ModelReceiver:
             logger.error(f"Error loading models: {e}")
             raise
     
+    def fuse_scaled_models(self):
+        """Replace scaler + model pairs with fused single-step equivalents where supported"""
+        for set_name, model_set in self.model_sets.items():
+            for name, (scaler, model) in model_set.items():
+                if scaler is None:
+                    continue
+                fused = build_fused_model(scaler, model)
+                if fused is not None:
+                    model_set[name] = (None, fused)
+                    logger.info(f"Using fused {type(fused).__name__} for {set_name} {name}")
+    
     def decompress_data(self, compressed_data_b64):
         """Decompress base64 encoded compressed data"""
         try:
@@ -114,101 +179,167 @@ class ModelReceiver:
             logger.error(f"Error compressing data: {e}")
             raise
     
-    def run_models_on_data(self, data, model_type="non_compressed"):
-        """Run all models on the given data"""
+    def run_models_on_data(self, data, model_type="non_compressed", mode=None, deadline=None):
+        """
+        Run the models on the given data
+        
+        Args:
+            data: Single row (list or numpy array)
+            model_type: "non_compressed", "decompressed" or "zlib"
+            mode: "ensemble" runs every model, "cascade" runs models in cost order and
+                  stops at the first confident one (defaults to config.INFERENCE_MODE)
+            deadline: time.time() by which model worker processes must answer
+                      (defaults to REQUEST_DEADLINE_SECONDS from now)
+        """
         try:
             start_time = time.time()
-            results = {}
+            mode = mode or config.INFERENCE_MODE
             
             # Convert data to numpy array if it's a list
             if isinstance(data, list):
                 data = np.array(data, dtype=np.float32)
             
+            if self.worker_pool is not None:
+                if deadline is None:
+                    deadline = start_time + config.REQUEST_DEADLINE_SECONDS
+                return self.worker_pool.run(data, model_type, mode, timeout=max(0.0, deadline - time.time()))
+            
             # Reshape data if needed (assuming single row)
             if len(data.shape) == 1:
                 data = data.reshape(1, -1)
             
-            logger.info(f"Running {model_type} models on data shape: {data.shape}")
+            logger.info("Running %s models (%s) on data shape: %s", model_type, mode, data.shape)
             
-            # Run KNN
-            knn_start = time.time()
-            if model_type == "zlib":
-                knn_pred = self.knn_model_zlib.predict(data)[0]
-            else:
-                knn_pred = self.knn_model.predict(data)[0]
-            knn_time = time.time() - knn_start
-            results['knn'] = {'prediction': int(knn_pred), 'time': knn_time}
-            
-            # Run Random Forest
-            rf_start = time.time()
-            if model_type == "zlib":
-                rf_pred = self.random_forest_model_zlib.predict(data)[0]
-            else:
-                rf_pred = self.random_forest_model.predict(data)[0]
-            rf_time = time.time() - rf_start
-            results['random_forest'] = {'prediction': int(rf_pred), 'time': rf_time}
-            
-            # Run XGBoost
-            xgb_start = time.time()
-            if model_type == "zlib":
-                xgb_pred = self.xgboost_model_zlib.predict(data)[0]
+            set_name = 'zlib' if model_type == "zlib" else 'standard'
+            if mode == "cascade":
+                results = self._run_cascade(data, set_name)
+            elif mode == "ensemble":
+                results = self._run_ensemble(data, set_name)
             else:
-                xgb_pred = self.xgboost_model.predict(data)[0]
-            xgb_time = time.time() - xgb_start
-            results['xgboost'] = {'prediction': int(xgb_pred), 'time': xgb_time}
-            
-            # Run SVM (with scaling)
-            svm_start = time.time()
-            if model_type == "zlib":
-                data_scaled = self.svm_scaler_zlib.transform(data)
-                svm_pred = self.svm_model_zlib.predict(data_scaled)[0]
-            else:
-                data_scaled = self.svm_scaler.transform(data)
-                svm_pred = self.svm_model.predict(data_scaled)[0]
-            svm_time = time.time() - svm_start
-            results['svm'] = {'prediction': int(svm_pred), 'time': svm_time}
-            
-            # Run Logistic Regression (with scaling)
-            lr_start = time.time()
-            if model_type == "zlib":
-                data_scaled = self.logistic_scaler_zlib.transform(data)
-                lr_pred = self.logistic_model_zlib.predict(data_scaled)[0]
-            else:
-                data_scaled = self.logistic_scaler.transform(data)
-                lr_pred = self.logistic_model.predict(data_scaled)[0]
-            lr_time = time.time() - lr_start
-            results['logistic_regression'] = {'prediction': int(lr_pred), 'time': lr_time}
+                raise ValueError(f"Unknown inference mode: {mode}")
             
             total_time = time.time() - start_time
             results['total_time'] = total_time
             results['model_type'] = model_type
+            results['inference_mode'] = mode
             
-            logger.info(f"{model_type} models completed in {total_time:.4f} seconds")
+            logger.info("%s models completed in %.4f seconds", model_type, total_time)
             return results
             
         except Exception as e:
             logger.error(f"Error running {model_type} models: {e}")
             raise
     
-    def process_non_compressed_data(self, data_payload):
+    def _run_model(self, set_name, name, scaler, model, data):
+        """Run one model (scaling first if it has a scaler) and time it"""
+        model_start = time.time()
+        if scaler is not None:
+            data = scaler.transform(data)
+        prediction = model.predict(data)[0]
+        elapsed = time.time() - model_start
+        self.cascade_stats.record_model_time(set_name, name, elapsed)
+        return {'prediction': int(prediction), 'time': elapsed}
+    
+    def _run_ensemble(self, data, set_name):
+        """Run every model in the set"""
+        return {
+            name: self._run_model(set_name, name, scaler, model, data)
+            for name, (scaler, model) in self.model_sets[set_name].items()
+        }
+    
+    def _run_cascade(self, data, set_name):
+        """
+        Run models cheapest first and stop at the first one whose top-two
+        probability margin clears config.CASCADE_MARGIN_THRESHOLD
+        """
+        cascade_start = time.time()
+        model_set = self.model_sets[set_name]
+        order = [name for name in config.CASCADE_ORDER if name in model_set]
+        results = {}
+        
+        for stage_index, name in enumerate(order):
+            scaler, model = model_set[name]
+            model_start = time.time()
+            scaled = scaler.transform(data) if scaler is not None else data
+            prediction, margin = prediction_margin(model, scaled)
+            elapsed = time.time() - model_start
+            self.cascade_stats.record_model_time(set_name, name, elapsed)
+            results[name] = {'prediction': int(prediction), 'time': elapsed, 'margin': margin}
+            
+            confident = margin is not None and margin >= config.CASCADE_MARGIN_THRESHOLD
+            if confident or stage_index == len(order) - 1:
+                break
+        
+        skipped = [name for name in order if name not in results]
+        results['cascade'] = {
+            'stage': name,
+            'stage_index': stage_index,
+            'prediction': int(prediction),
+            'margin': margin,
+            'models_run': stage_index + 1
+        }
+        self.cascade_stats.record_cascade(set_name, name, stage_index + 1, skipped, time.time() - cascade_start)
+        
+        # Sample a fraction of requests against the full ensemble to measure agreement
+        # (every model in the set, including any left out of CASCADE_ORDER)
+        not_run = [name for name in model_set if name not in results]
+        if not_run and np.random.random() < config.CASCADE_AUDIT_RATE:
+            audit = {name: self._run_model(set_name, name, *model_set[name], data)['prediction'] for name in not_run}
+            votes = [results[name]['prediction'] if name in results else audit[name] for name in model_set]
+            ensemble_prediction = majority_vote(votes)
+            self.cascade_stats.record_audit(int(prediction), ensemble_prediction)
+            results['cascade']['audit_ensemble_prediction'] = ensemble_prediction
+        
+        return results
+    
+    def store_results(self, *results):
+        """Append results to the buffer, keeping only the last 100"""
+        with self.results_lock:
+            self.results_buffer.extend(results)
+            if len(self.results_buffer) > 100:
+                del self.results_buffer[:len(self.results_buffer) - 100]
+            for result in results:
+                self.update_abnormal_flag(result)
+    
+    def update_abnormal_flag(self, results):
+        """Flag a device for priority service when its latest prediction is not the normal class"""
+        device_id = results.get('device_id')
+        if device_id is None:
+            return
+        if 'cascade' in results:
+            prediction = results['cascade']['prediction']
+        else:
+            prediction = majority_vote([
+                value['prediction'] for value in results.values()
+                if isinstance(value, dict) and 'prediction' in value
+            ])
+        if prediction != config.NORMAL_CLASS:
+            self.abnormal_devices[device_id] = time.time() + config.ABNORMAL_PRIORITY_SECONDS
+    
+    def admit(self, func, payload, priority):
+        """Run func(payload, deadline) through the admission controller with the payload's deadline and priority"""
+        device_id = payload.get('device_id')
+        if payload.get('abnormal') or self.abnormal_devices.get(device_id, 0) > time.time():
+            priority = PRIORITY_ABNORMAL
+        deadline = deadline_from_timestamp(payload.get('timestamp'), config.REQUEST_DEADLINE_SECONDS)
+        return self.admission.submit(func, payload, deadline, priority=priority, deadline=deadline)
+    
+    def process_non_compressed_data(self, data_payload, deadline=None):
         """Process non-compressed data through all models"""
         try:
             timestamp = data_payload.get('timestamp')
             data = data_payload.get('data')
             
-            logger.info(f"Processing non-compressed data with timestamp: {timestamp}")
+            logger.info("Processing non-compressed data with timestamp: %s", timestamp)
             
             # Run models on non-compressed data
-            results = self.run_models_on_data(data, "non_compressed")
+            results = self.run_models_on_data(data, "non_compressed", data_payload.get('inference_mode'), deadline)
             results['timestamp'] = timestamp
             results['data_type'] = 'non_compressed'
+            results['device_id'] = data_payload.get('device_id')
             
             # Store results
-            with self.results_lock:
-                self.results_buffer.append(results)
-                # Keep only last 100 results
-                if len(self.results_buffer) > 100:
-                    self.results_buffer.pop(0)
+            self.store_results(results)
             
             return results
             
@@ -216,44 +347,40 @@ class ModelReceiver:
             logger.error(f"Error processing non-compressed data: {e}")
             raise
     
-    def process_compressed_data(self, compressed_payload):
+    def process_compressed_data(self, compressed_payload, deadline=None):
         """Process compressed data through all models"""
         try:
             timestamp = compressed_payload.get('timestamp')
             compressed_data_b64 = compressed_payload.get('compressed_data')
             
-            logger.info(f"Processing compressed data with timestamp: {timestamp}")
-            logger.info(f"Compressed data size: {compressed_payload.get('compressed_size', 'N/A')}")
-            logger.info(f"Compression type: {compressed_payload.get('compression_type', 'N/A')}")
+            logger.info("Processing compressed data with timestamp: %s (size: %s, type: %s)", timestamp,
+                        compressed_payload.get('compressed_size', 'N/A'), compressed_payload.get('compression_type', 'N/A'))
             
             # Decompress data
             decompressed_data = self.decompress_data(compressed_data_b64)
-            logger.info(f"Decompressed data shape: {decompressed_data.shape if hasattr(decompressed_data, 'shape') else 'N/A'}")
+            logger.debug("Decompressed data shape: %s", decompressed_data.shape)
             
             # Run models on decompressed data (standard models)
-            results = self.run_models_on_data(decompressed_data, "decompressed")
+            inference_mode = compressed_payload.get('inference_mode')
+            results = self.run_models_on_data(decompressed_data, "decompressed", inference_mode, deadline)
             results['timestamp'] = timestamp
             results['data_type'] = 'decompressed'
+            results['device_id'] = compressed_payload.get('device_id')
             
             # Compress data for zlib models (matching training process)
             compressed_for_zlib = self.compress_data(decompressed_data)
-            logger.info(f"Compressed data for zlib models shape: {compressed_for_zlib.shape}")
+            logger.debug("Compressed data for zlib models shape: %s", compressed_for_zlib.shape)
             
             # Run models on compressed data (zlib models)
-            zlib_results = self.run_models_on_data(compressed_for_zlib, "zlib")
+            zlib_results = self.run_models_on_data(compressed_for_zlib, "zlib", inference_mode, deadline)
             zlib_results['timestamp'] = timestamp
             zlib_results['data_type'] = 'zlib'
+            zlib_results['device_id'] = compressed_payload.get('device_id')
             
             # Store both results
-            with self.results_lock:
-                self.results_buffer.append(results)
-                self.results_buffer.append(zlib_results)
-                # Keep only last 100 results
-                if len(self.results_buffer) > 100:
-                    self.results_buffer.pop(0)
-                    self.results_buffer.pop(0)
+            self.store_results(results, zlib_results)
             
-            logger.info(f"Successfully processed compressed data - stored {len(results)} and {len(zlib_results)} results")
+            logger.debug("Successfully processed compressed data - stored %d and %d results", len(results), len(zlib_results))
             
             return {
                 'decompressed_results': results,
@@ -261,21 +388,80 @@ class ModelReceiver:
             }
             
         except Exception as e:
-            logger.error(f"Error processing compressed data: {e}")
-            logger.error(f"Exception type: {type(e).__name__}")
-            import traceback
-            logger.error(f"Traceback: {traceback.format_exc()}")
+            logger.exception("Error processing compressed data (%s): %s", type(e).__name__, e)
+            raise
+    
+    def score_stream_window(self, window_payload, deadline=None):
+        """Run the models on one stream window (called through admission control)"""
+        return self.run_models_on_data(window_payload['window'], "non_compressed", None, deadline)
+    
+    def process_stream_chunk(self, device_id, chunk):
+        """
+        Push a chunk of raw samples into the device buffer and score every completed window
+        
+        Windows go through admission control at stream priority (abnormal priority for
+        flagged devices). Scoring blocks the stream's connection, which pushes back on
+        the sender; a shed window is skipped and counted in the buffer's windows_shed.
+        """
+        try:
+            # Validate before touching the buffer: a bad chunk must not shift later windows
+            samples = parse_samples(chunk.get('samples') if isinstance(chunk, dict) else None)
+            timestamp = chunk.get('timestamp')
+            buffer = self.streams.get(device_id)
+            
+            window_results = []
+            with buffer.lock:
+                for window_index, start_sample, window in buffer.push(samples):
+                    # The window is a view into the ring buffer; score it before advancing
+                    window_payload = {'device_id': device_id, 'timestamp': timestamp, 'window': window}
+                    try:
+                        results = self.admit(self.score_stream_window, window_payload, PRIORITY_STREAM)
+                    except AdmissionRejected as e:
+                        buffer.windows_shed += 1
+                        logger.warning("Shed stream window %d from %s: %s", window_index, device_id, e.reason)
+                        continue
+                    results['timestamp'] = timestamp
+                    results['data_type'] = 'stream'
+                    results['device_id'] = device_id
+                    results['window_index'] = window_index
+                    results['start_sample'] = start_sample
+                    window_results.append(results)
+            
+            if window_results:
+                self.store_results(*window_results)
+            
+            return window_results
+            
+        except Exception as e:
+            logger.error(f"Error processing stream chunk from {device_id}: {e}")
             raise
     
     def setup_routes(self):
         """Setup Flask routes"""
         
+        @self.app.before_request
+        def record_traffic():
+            """Capture the raw body before admission so shed requests are recorded too"""
+            # Only recordable endpoints: reading the body here would drain /stream/<device_id>
+            if self.recorder is not None and request.method == 'POST' and request.path in ENDPOINT_CODES:
+                self.recorder.record(request.path, request.get_data(cache=True))
+        
+        def rejection_response(rejection):
+            """429/503 with Retry-After for shed requests"""
+            response = jsonify({'success': False, 'error': rejection.reason, 'retry_after': rejection.retry_after})
+            response.status_code = rejection.status_code
+            response.headers['Retry-After'] = str(rejection.retry_after)
+            return response
+        
         @self.app.route('/process_non_compressed', methods=['POST'])
         def handle_non_compressed():
             try:
                 data = request.json
-                results = self.process_non_compressed_data(data)
+                results = self.admit(self.process_non_compressed_data, data, PRIORITY_NON_COMPRESSED)
                 return jsonify({'success': True, 'results': results})
+            except AdmissionRejected as e:
+                logger.warning("Shed non-compressed request: %s", e.reason)
+                return rejection_response(e)
             except Exception as e:
                 logger.error(f"Error handling non-compressed data: {e}")
                 return jsonify({'success': False, 'error': str(e)}), 500
@@ -284,12 +470,93 @@ class ModelReceiver:
         def handle_compressed():
             try:
                 data = request.json
-                results = self.process_compressed_data(data)
+                results = self.admit(self.process_compressed_data, data, PRIORITY_COMPRESSED)
                 return jsonify({'success': True, 'results': results})
+            except AdmissionRejected as e:
+                logger.warning("Shed compressed request: %s", e.reason)
+                return rejection_response(e)
             except Exception as e:
                 logger.error(f"Error handling compressed data: {e}")
                 return jsonify({'success': False, 'error': str(e)}), 500
         
+        @self.app.route('/stream/<device_id>', methods=['POST'])
+        def handle_stream(device_id):
+            """Ingest newline-delimited JSON sample chunks over a single (chunked) connection"""
+            try:
+                hop_size = request.args.get('hop', type=int)
+                if 'hop' in request.args and (hop_size is None or hop_size <= 0):
+                    return jsonify({'success': False, 'error': 'hop must be a positive integer'}), 400
+                buffer = self.streams.get(device_id, hop_size)
+                if request.args.get('reset', type=int):
+                    with buffer.lock:
+                        buffer.reset()
+                
+                chunks_received = 0
+                chunks_rejected = 0
+                windows_scored = 0
+                windows_shed = buffer.windows_shed
+                stream = request.stream
+                while True:
+                    line = stream.readline()
+                    if not line:
+                        break
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        chunk = json.loads(line)
+                        parse_samples(chunk.get('samples') if isinstance(chunk, dict) else None)
+                    except ValueError as e:
+                        # Skip malformed chunks (bad JSON, missing / non-numeric samples) without ending the stream
+                        chunks_rejected += 1
+                        logger.warning("Rejected stream chunk from %s: %s", device_id, e)
+                        continue
+                    window_results = self.process_stream_chunk(device_id, chunk)
+                    chunks_received += 1
+                    windows_scored += len(window_results)
+                
+                logger.info("Stream from %s closed: %d chunks, %d windows scored", device_id, chunks_received, windows_scored)
+                return jsonify({
+                    'success': True,
+                    'device_id': device_id,
+                    'chunks_received': chunks_received,
+                    'chunks_rejected': chunks_rejected,
+                    'windows_scored': windows_scored,
+                    'windows_shed': buffer.windows_shed - windows_shed,
+                    'samples_seen': buffer.samples_seen
+                })
+            except Exception as e:
+                logger.error(f"Error handling stream from {device_id}: {e}")
+                return jsonify({'success': False, 'error': str(e)}), 500
+        
+        @self.app.route('/stream_stats', methods=['GET'])
+        def stream_stats():
+            """Per-device streaming counters"""
+            return jsonify({'success': True, 'streams': self.streams.stats()})
+        
+        @self.app.route('/admission_stats', methods=['GET'])
+        def admission_stats():
+            """Ingress queue depth and shed counters"""
+            now = time.time()
+            stats = self.admission.stats()
+            stats['abnormal_devices'] = [device for device, expiry in self.abnormal_devices.items() if expiry > now]
+            return jsonify({'success': True, 'stats': stats})
+        
+        @self.app.route('/cascade_stats', methods=['GET'])
+        def cascade_stats():
+            """Cascade scheduler statistics: stage hit counts, compute saved and agreement lost"""
+            stats = self.cascade_stats
+            if self.worker_pool is not None:
+                # The cascade runs in the worker processes, which send their counters back
+                stats = CascadeStats.merged([stats.snapshot()] + self.worker_pool.cascade_stats_snapshots())
+            return jsonify({
+                'success': True,
+                'inference_mode': config.INFERENCE_MODE,
+                'cascade_order': config.CASCADE_ORDER,
+                'margin_threshold': config.CASCADE_MARGIN_THRESHOLD,
+                'stats': stats.summary()
+            })
+        
         @self.app.route('/get_results', methods=['GET'])
         def get_results():
             """Get all stored results for frontend"""
@@ -304,10 +571,28 @@ class ModelReceiver:
                 logger.error(f"Error getting results: {e}")
                 return jsonify({'success': False, 'error': str(e)}), 500
         
+        @self.app.route('/debug/memory', methods=['GET'])
+        def debug_memory():
+            """Per-model bytes, compaction results and process RSS (per worker process when models run in workers)"""
+            if self.worker_pool is not None:
+                return jsonify({
+                    'success': True,
+                    'process': process_memory(),
+                    'workers': self.worker_pool.memory_reports()
+                })
+            return jsonify({'success': True, **memory_report(self.model_sets), 'compaction': self.compaction})
+        
         @self.app.route('/health', methods=['GET'])
         def health_check():
             """Health check endpoint"""
-            return jsonify({'status': 'healthy', 'timestamp': datetime.now().isoformat()})
+            stats = self.admission.stats()
+            return jsonify({
+                'status': 'healthy',
+                'timestamp': datetime.now().isoformat(),
+                'queue_depth': stats['queue_depth'],
+                'shed': (stats['shed_queue_full'] + stats['shed_evicted'] + stats['shed_deadline']
+                         + stats['expired_in_queue'])
+            })
     
     def run(self):
         """Run the Flask server"""
@@ -315,9 +600,14 @@ class ModelReceiver:
         self.app.run(host='0.0.0.0', port=self.port, debug=False)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ECG model receiver")
+    parser.add_argument('--port', type=int, default=None, help="Port to listen on (defaults to config)")
+    parser.add_argument('--record', default=None, help="Append incoming payloads to this traffic recording")
+    args = parser.parse_args()
+    
     # Print current configuration
     config.print_config()
     
     # Create and run receiver
-    receiver = ModelReceiver()
+    receiver = ModelReceiver(port=args.port, record_path=args.record)
     receiver.run() 
\ No newline at end of file
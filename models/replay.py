@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Replay a traffic recording against a receiver and report throughput and latency
+
+    python3 replay.py traffic.bin --speed 1      # original arrival pattern
+    python3 replay.py traffic.bin --speed 10     # 10x faster
+    python3 replay.py traffic.bin --speed max    # as fast as --concurrency allows
+"""
+
+import argparse
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import requests
+from config import config
+from server import DataServer
+from traffic_recorder import read_recording
+
+logger = logging.getLogger(__name__)
+
+
+class TrafficReplayer(DataServer):
+    """DataServer that re-sends recorded payloads with their original relative timing"""
+
+    def __init__(self, recording_path, receiver_url, speed=1.0, concurrency=16, rewrite_timestamps=True):
+        """
+        Initialize the replayer
+
+        Args:
+            recording_path: Recording written by TrafficRecorder
+            receiver_url: Base URL of the receiver to replay against
+            speed: Time compression factor (None replays as fast as possible)
+            concurrency: Maximum requests in flight
+            rewrite_timestamps: Replace payload timestamps with the send time so
+                                receiver deadlines are computed as they were originally
+        """
+        self.receiver_url = receiver_url.rstrip('/')
+        self.speed = speed
+        self.concurrency = concurrency
+        self.rewrite_timestamps = rewrite_timestamps
+        super().__init__(
+            recording_path,
+            f"{self.receiver_url}/process_non_compressed",
+            f"{self.receiver_url}/process_compressed"
+        )
+
+    def load_data(self):
+        """Load the recording into memory"""
+        try:
+            self.data = list(read_recording(self.csv_file_path))
+            logger.info(f"Loaded {len(self.data)} recorded requests from {self.csv_file_path}")
+        except Exception as e:
+            logger.error(f"Error loading recording: {e}")
+            raise
+
+    def send_recorded(self, path, body, due):
+        """
+        Send one recorded body; returns (status_code, latency_seconds, lateness_seconds)
+
+        Both are measured from ``due`` (the scheduled send time), so time spent
+        waiting for a free worker when --concurrency is saturated is counted.
+        """
+        lateness = time.perf_counter() - due
+        if self.rewrite_timestamps:
+            try:
+                payload = json.loads(body)
+                payload['timestamp'] = self.create_timestamp()
+                body = json.dumps(payload)
+            except (ValueError, TypeError):
+                # Bodies are recorded before parsing; replay malformed ones unchanged
+                pass
+
+        try:
+            response = requests.post(
+                f"{self.receiver_url}{path}",
+                data=body,
+                headers={'Content-Type': 'application/json'},
+                timeout=30
+            )
+            status = response.status_code
+        except Exception as e:
+            logger.error(f"Error replaying request to {path}: {e}")
+            status = None
+        return status, time.perf_counter() - due, lateness
+
+    def replay(self):
+        """Replay the whole recording and return a summary report"""
+        if not self.data:
+            raise ValueError("Recording is empty")
+
+        first_arrival = self.data[0][0]
+        futures = []
+        logger.info(f"Replaying {len(self.data)} requests at {self.speed or 'max'}x against {self.receiver_url}")
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            for arrival_time, path, body in self.data:
+                if self.speed:
+                    # Open loop: dispatch on the recorded schedule regardless of response times
+                    due = start + (arrival_time - first_arrival) / self.speed
+                    delay = due - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                else:
+                    due = time.perf_counter()
+                futures.append(pool.submit(self.send_recorded, path, body, due))
+            results = [future.result() for future in futures]
+        duration = time.perf_counter() - start
+
+        return self.build_report(results, duration)
+
+    def build_report(self, results, duration):
+        """Throughput and latency percentiles (ms) from (status, latency, lateness) tuples"""
+        statuses = [status for status, _, _ in results]
+        latencies = np.array([latency for status, latency, _ in results if status == 200]) * 1000
+        report = {
+            'requests': len(results),
+            'succeeded': statuses.count(200),
+            'shed': statuses.count(429) + statuses.count(503),
+            'failed': sum(1 for status in statuses if status not in (200, 429, 503)),
+            'duration_seconds': duration,
+            'throughput_rps': len(results) / duration if duration else 0.0,
+            'speed': self.speed or 'max'
+        }
+        if len(latencies):
+            for percentile in (50, 90, 99):
+                report[f'latency_p{percentile}_ms'] = float(np.percentile(latencies, percentile))
+            report['latency_max_ms'] = float(latencies.max())
+        if self.speed:
+            lateness = [lateness for _, _, lateness in results]
+            report['dispatch_lateness_p99_ms'] = float(np.percentile(lateness, 99) * 1000)
+        return report
+
+
+def print_report(report):
+    print("=" * 60)
+    print("🔁 Replay Report")
+    print("=" * 60)
+    for key, value in report.items():
+        print(f"   {key}: {value:.2f}" if isinstance(value, float) else f"   {key}: {value}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded receiver traffic")
+    parser.add_argument('recording', help="Recording written with receiver.py --record")
+    parser.add_argument('--receiver', default=config.receiver_local_url, help="Receiver base URL")
+    parser.add_argument('--speed', default='1', help="Replay speed factor, or 'max'")
+    parser.add_argument('--concurrency', type=int, default=16, help="Maximum requests in flight")
+    parser.add_argument('--keep-timestamps', action='store_true',
+                        help="Send the recorded timestamps instead of the replay time")
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+    args = parser.parse_args()
+
+    replayer = TrafficReplayer(
+        args.recording,
+        args.receiver,
+        speed=None if args.speed == 'max' else float(args.speed),
+        concurrency=args.concurrency,
+        rewrite_timestamps=not args.keep_timestamps
+    )
+    report = replayer.replay()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
@@ -0,0 +1,245 @@
+import argparse
+import bisect
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import requests
+from flask import Flask, Response, request, jsonify
+from flask_cors import CORS
+from config import config
+from log_pipeline import setup_logging
+
+# Configure logging (background queue listener, sampled and rate limited)
+setup_logging()
+logger = logging.getLogger(__name__)
+
+# Response headers that must not be copied from a shard response
+HOP_BY_HOP_HEADERS = {'connection', 'content-length', 'content-encoding', 'transfer-encoding', 'keep-alive'}
+
+
+def _hash(key):
+    return int.from_bytes(hashlib.md5(key.encode('utf-8')).digest()[:8], 'big')
+
+
+class HashRing:
+    """Consistent hash ring with virtual nodes"""
+
+    def __init__(self, nodes, virtual_nodes=64):
+        self.nodes = list(nodes)
+        points = sorted(
+            (_hash(f"{node}#{index}"), node)
+            for node in self.nodes
+            for index in range(virtual_nodes)
+        )
+        self._hashes = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    def candidates(self, key):
+        """Distinct nodes in ring order starting at the key's owner (owner first, then failover order)"""
+        start = bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)
+        seen = []
+        for offset in range(len(self._owners)):
+            node = self._owners[(start + offset) % len(self._owners)]
+            if node not in seen:
+                seen.append(node)
+                if len(seen) == len(self.nodes):
+                    break
+        return seen
+
+
+class ShardRouter:
+    def __init__(self, shard_urls, port=None):
+        """
+        Initialize the shard router
+
+        Args:
+            shard_urls: Base URLs of the receiver instances
+            port: Port for the Flask server (defaults to config.RECEIVER_PORT so the relay and frontend need no changes)
+        """
+        if not shard_urls:
+            raise ValueError("At least one receiver shard is required")
+        self.port = port or config.RECEIVER_PORT
+        self.shard_urls = [url.rstrip('/') for url in shard_urls]
+        self.ring = HashRing(self.shard_urls, config.SHARD_VIRTUAL_NODES)
+
+        self.healthy = {url: True for url in self.shard_urls}
+        self.health_lock = threading.Lock()
+        self.routed = {url: 0 for url in self.shard_urls}
+        self.rerouted = 0
+        self.pool = ThreadPoolExecutor(max_workers=len(self.shard_urls))
+
+        self.app = Flask(__name__)
+        CORS(self.app)  # Enable CORS for frontend communication
+        self.setup_routes()
+
+        threading.Thread(target=self.health_loop, name="shard-health", daemon=True).start()
+
+    def route_key(self, payload, default):
+        """Shard key: the device id, so every stream of a device lands on the same receiver"""
+        return str((payload or {}).get('device_id') or default)
+
+    def shards_for(self, key):
+        """Healthy shards for a key in failover order (all shards if none are marked healthy)"""
+        candidates = self.ring.candidates(key)
+        with self.health_lock:
+            healthy = [url for url in candidates if self.healthy[url]]
+        return healthy or candidates
+
+    def mark(self, url, healthy):
+        with self.health_lock:
+            changed = self.healthy[url] != healthy
+            self.healthy[url] = healthy
+        if changed:
+            if healthy:
+                logger.info("Shard %s is healthy again", url)
+            else:
+                logger.warning(f"Shard {url} marked unhealthy")
+
+    def check_shard(self, url):
+        try:
+            response = requests.get(f"{url}/health", timeout=config.SHARD_HEALTH_TIMEOUT)
+            self.mark(url, response.status_code == 200)
+        except requests.RequestException:
+            self.mark(url, False)
+
+    def health_loop(self):
+        """Poll every shard's /health in the background"""
+        while True:
+            list(self.pool.map(self.check_shard, self.shard_urls))
+            time.sleep(config.SHARD_HEALTH_INTERVAL)
+
+    def forward(self, key, path, **kwargs):
+        """
+        Send a request to the key's shard, failing over along the ring on connection errors
+
+        Shed responses (429/503) are returned as-is: they mean the shard is
+        overloaded, and moving its devices elsewhere would only spread the overload.
+        """
+        last_error = None
+        for attempt, url in enumerate(self.shards_for(key)):
+            try:
+                response = requests.post(f"{url}{path}", timeout=config.SHARD_REQUEST_TIMEOUT, **kwargs)
+                self.routed[url] += 1
+                if attempt:
+                    self.rerouted += 1
+                return response
+            except requests.ConnectionError as e:
+                self.mark(url, False)
+                last_error = e
+        raise last_error
+
+    def relay_response(self, response):
+        """Copy a shard response back to the caller"""
+        headers = [(name, value) for name, value in response.headers.items()
+                   if name.lower() not in HOP_BY_HOP_HEADERS]
+        return Response(response.content, status=response.status_code, headers=headers)
+
+    def collect_results(self):
+        """Merge /get_results from every healthy shard, newest last, capped at 100 like a single receiver"""
+        def fetch(url):
+            try:
+                response = requests.get(f"{url}/get_results", timeout=config.SHARD_REQUEST_TIMEOUT)
+                results = response.json().get('results', [])
+                for result in results:
+                    result['shard'] = url
+                return results
+            except (requests.RequestException, ValueError):
+                self.mark(url, False)
+                return []
+
+        with self.health_lock:
+            shards = [url for url in self.shard_urls if self.healthy[url]]
+        merged = [result for results in self.pool.map(fetch, shards) for result in results]
+        merged.sort(key=lambda result: result.get('timestamp') or '')
+        return merged[-100:]
+
+    def setup_routes(self):
+        """Setup Flask routes"""
+
+        @self.app.route('/process_non_compressed', methods=['POST'])
+        @self.app.route('/process_compressed', methods=['POST'])
+        def handle_process():
+            try:
+                body = request.get_data()
+                key = self.route_key(request.get_json(silent=True), request.path)
+                response = self.forward(key, request.path, data=body, headers={'Content-Type': 'application/json'})
+                return self.relay_response(response)
+            except Exception as e:
+                logger.error(f"Error routing {request.path}: {e}")
+                return jsonify({'success': False, 'error': 'No receiver shard available', 'details': str(e)}), 503
+
+        @self.app.route('/stream/<device_id>', methods=['POST'])
+        def handle_stream(device_id):
+            """Proxy a chunked sample stream to the device's shard (not re-routed mid-stream)"""
+            try:
+                url = self.shards_for(device_id)[0]
+                # One NDJSON line at a time: read(n) would hold samples back until n bytes arrived
+                chunks = iter(lambda: request.stream.readline(65536), b'')
+                response = requests.post(
+                    f"{url}/stream/{device_id}",
+                    data=chunks,
+                    params=request.args,
+                    headers={'Content-Type': request.content_type or 'application/x-ndjson'}
+                )
+                self.routed[url] += 1
+                return self.relay_response(response)
+            except requests.ConnectionError as e:
+                self.mark(url, False)
+                logger.error(f"Stream from {device_id} to {url} failed: {e}")
+                return jsonify({'success': False, 'error': 'Receiver shard unavailable', 'details': str(e)}), 503
+
+        @self.app.route('/get_results', methods=['GET'])
+        def get_results():
+            """Get results from all shards for frontend"""
+            try:
+                results = self.collect_results()
+                return jsonify({'success': True, 'results': results, 'count': len(results)})
+            except Exception as e:
+                logger.error(f"Error getting results: {e}")
+                return jsonify({'success': False, 'error': str(e)}), 500
+
+        @self.app.route('/shards', methods=['GET'])
+        def shards():
+            """Shard health and routing counters"""
+            with self.health_lock:
+                healthy = dict(self.healthy)
+            return jsonify({
+                'success': True,
+                'shards': [
+                    {'url': url, 'healthy': healthy[url], 'routed': self.routed[url]}
+                    for url in self.shard_urls
+                ],
+                'rerouted': self.rerouted
+            })
+
+        @self.app.route('/health', methods=['GET'])
+        def health_check():
+            """Healthy while at least one shard is"""
+            with self.health_lock:
+                healthy_count = sum(self.healthy.values())
+            status = 'healthy' if healthy_count else 'unhealthy'
+            return jsonify({
+                'status': status,
+                'timestamp': datetime.now().isoformat(),
+                'healthy_shards': healthy_count,
+                'shards': len(self.shard_urls)
+            }), 200 if healthy_count else 503
+
+    def run(self):
+        """Run the Flask server"""
+        logger.info(f"Starting Shard Router on port {self.port} for {len(self.shard_urls)} receivers")
+        self.app.run(host='0.0.0.0', port=self.port, debug=False, threaded=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Consistent-hash router in front of several receivers")
+    parser.add_argument('--shards', default=None,
+                        help="Comma-separated receiver base URLs (defaults to config.receiver_shard_urls)")
+    parser.add_argument('--port', type=int, default=None)
+    args = parser.parse_args()
+
+    shard_urls = args.shards.split(',') if args.shards else config.receiver_shard_urls
+    router = ShardRouter(shard_urls, port=args.port)
+    router.run()
@@ -5,12 +5,14 @@ import json
 import time
 import requests
 import random
-from datetime import datetime
+from datetime import datetime, timezone
 import logging
+import argparse
 from config import config
+from log_pipeline import setup_logging
 
-# Configure logging
-logging.basicConfig(level=config.LOG_LEVEL, format=config.LOG_FORMAT)
+# Configure logging (background queue listener, sampled and rate limited)
+setup_logging()
 logger = logging.getLogger(__name__)
 
 class DataServer:
@@ -66,8 +68,8 @@ class DataServer:
             raise
     
     def create_timestamp(self):
-        """Create current timestamp"""
-        return datetime.now().isoformat()
+        """Create current timestamp (UTC with offset, so the receiver's deadline doesn't depend on either host's timezone)"""
+        return datetime.now(timezone.utc).isoformat()
     
     def prepare_data_payload(self, data_row, timestamp):
         """Prepare data payload with timestamp"""
@@ -81,6 +83,7 @@ class DataServer:
         
         payload = {
             "timestamp": timestamp,
+            "device_id": config.DEVICE_ID,
             "data": data_list,
             "data_shape": data_row.shape if hasattr(data_row, 'shape') else [1, len(data_list)],
             "data_type": str(data_row.dtype) if hasattr(data_row, 'dtype') else 'float32'
@@ -95,6 +98,7 @@ class DataServer:
         
         payload = {
             "timestamp": timestamp,
+            "device_id": config.DEVICE_ID,
             "compressed_data": compressed_b64,
             "compressed_size": len(compressed_data),
             "compression_type": "zlib"
@@ -108,8 +112,12 @@ class DataServer:
             response = requests.post(endpoint, json=payload, headers=headers, timeout=30)
             
             if response.status_code == 200:
-                logger.info(f"Successfully sent data to {endpoint}")
+                logger.info("Successfully sent data to %s", endpoint)
                 return True
+            elif response.status_code in (429, 503):
+                logger.warning(f"Receiver shed data sent to {endpoint} (status {response.status_code}, "
+                               f"Retry-After: {response.headers.get('Retry-After', 'N/A')})")
+                return False
             else:
                 logger.error(f"Failed to send data to {endpoint}. Status: {response.status_code}")
                 logger.error(f"Response: {response.text}")
@@ -126,8 +134,8 @@ class DataServer:
             selected_row = self.select_random_row()
             timestamp = self.create_timestamp()
             
-            logger.info(f"Selected row at index {selected_row.name}, timestamp: {timestamp}")
-            logger.info(f"Data type: {type(selected_row)}, Shape: {getattr(selected_row, 'shape', 'N/A')}")
+            logger.info("Selected row at index %s, timestamp: %s", selected_row.name, timestamp)
+            logger.debug("Data type: %s, Shape: %s", type(selected_row), getattr(selected_row, 'shape', 'N/A'))
             
             # Prepare non-compressed payload
             non_compressed_payload = self.prepare_data_payload(selected_row, timestamp)
@@ -167,7 +175,89 @@ class DataServer:
         except Exception as e:
             logger.error(f"Server error: {e}")
 
+    def iter_stream_chunks(self, chunk_samples, sample_rate_hz=None, max_samples=None):
+        """
+        Play CSV rows back to back as one continuous signal, split into chunks
+        
+        Args:
+            chunk_samples: Number of samples per chunk
+            sample_rate_hz: Pace chunks at this sample rate (None sends as fast as possible)
+            max_samples: Stop after this many samples (None loops over the file forever)
+        """
+        signal = self.data.values.astype(np.float32).ravel()
+        if len(signal) == 0:
+            raise ValueError("No data loaded")
+        
+        sent = 0
+        position = 0
+        next_send = time.time()
+        while max_samples is None or sent < max_samples:
+            count = chunk_samples if max_samples is None else min(chunk_samples, max_samples - sent)
+            end = position + count
+            if end <= len(signal):
+                chunk = signal[position:end]
+            else:
+                # Wrap around to the start of the recording
+                chunk = np.concatenate((signal[position:], signal[:end - len(signal)]))
+            position = end % len(signal)
+            sent += count
+            
+            if sample_rate_hz:
+                delay = next_send - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+                next_send += count / sample_rate_hz
+            
+            yield chunk
+    
+    def _stream_body(self, chunks):
+        """Encode sample chunks as newline-delimited JSON"""
+        for chunk in chunks:
+            line = json.dumps({"timestamp": self.create_timestamp(), "samples": chunk.tolist()})
+            yield (line + "\n").encode('utf-8')
+    
+    def run_streaming(self, stream_endpoint, device_id, chunk_samples=None, sample_rate_hz=None,
+                      hop_size=None, max_samples=None):
+        """Stream the CSV as a continuous signal to the receiver over one persistent connection"""
+        chunk_samples = chunk_samples or config.STREAM_CHUNK_SAMPLES
+        url = f"{stream_endpoint}/{device_id}"
+        params = {'reset': 1}
+        if hop_size:
+            params['hop'] = hop_size
+        
+        logger.info(f"Starting continuous stream to {url} ({chunk_samples} samples/chunk at {sample_rate_hz or 'max'} Hz)")
+        
+        try:
+            chunks = self.iter_stream_chunks(chunk_samples, sample_rate_hz, max_samples)
+            # A generator body makes requests use chunked transfer encoding on a single connection
+            response = requests.post(
+                url,
+                data=self._stream_body(chunks),
+                params=params,
+                headers={'Content-Type': 'application/x-ndjson'}
+            )
+            if response.status_code == 200:
+                logger.info(f"Stream closed: {response.json()}")
+                return True
+            else:
+                logger.error(f"Stream to {url} failed. Status: {response.status_code}")
+                logger.error(f"Response: {response.text}")
+                return False
+                
+        except KeyboardInterrupt:
+            logger.info("Stream stopped by user")
+        except Exception as e:
+            logger.error(f"Error streaming to {url}: {e}")
+            return False
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ECG data server")
+    parser.add_argument('--stream', action='store_true',
+                        help="Stream CSV rows to the receiver as a continuous signal")
+    parser.add_argument('--device-id', default=config.DEVICE_ID)
+    parser.add_argument('--hop', type=int, default=None, help="Window hop in samples")
+    args = parser.parse_args()
+    
     # Print current configuration
     config.print_config()
     
@@ -178,5 +268,13 @@ if __name__ == "__main__":
         firebase_endpoint_2=config.firebase_endpoint_2
     )
     
-    # Run continuously
-    server.run_continuous(interval_seconds=config.DATA_INTERVAL_SECONDS) 
\ No newline at end of file
+    if args.stream:
+        server.run_streaming(
+            config.receiver_stream_endpoint,
+            args.device_id,
+            sample_rate_hz=config.STREAM_SAMPLE_RATE_HZ,
+            hop_size=args.hop
+        )
+    else:
+        # Run continuously
+        server.run_continuous(interval_seconds=config.DATA_INTERVAL_SECONDS) 
\ No newline at end of file
@@ -0,0 +1,169 @@
+import multiprocessing as mp
+import time
+from multiprocessing import shared_memory
+import numpy as np
+
+# Payload dtypes a slot can carry (float32 rows or uint8 zlib features)
+DTYPES = [np.dtype(np.float32), np.dtype(np.uint8)]
+DTYPE_CODES = {dtype: code for code, dtype in enumerate(DTYPES)}
+
+# Per-slot metadata, stored in shared memory ahead of the payload area
+SLOT_HEADER = np.dtype([
+    ('seq', np.int64),          # slot state, see SharedRingBuffer
+    ('request_id', np.int64),
+    ('n_rows', np.int32),
+    ('n_features', np.int32),
+    ('dtype', np.int32),
+    ('tag', np.int32)           # free for the caller (e.g. model type / mode)
+])
+
+
+class Empty(Exception):
+    """Raised by get() when nothing arrives before the timeout"""
+
+
+class Full(Exception):
+    """Raised by put() when no slot frees up before the timeout"""
+
+
+def _attach(name):
+    """Attach to an existing block; only the creating process unlinks it"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 always registers the block, but worker processes share
+        # their parent's resource tracker, so the duplicate registration is a no-op
+        return shared_memory.SharedMemory(name=name)
+
+
+class SharedRingBuffer:
+    """
+    Multi-producer / multi-consumer ring of fixed-size slots in shared memory
+
+    Each slot holds up to ``max_rows`` rows of ``max_features`` float32 (or
+    uint8) values plus a header. Slot ownership follows sequence numbers: for
+    ticket ``pos`` a slot is writable when ``seq == pos``, readable when
+    ``seq == pos + 1`` and becomes writable for the next lap
+    (``pos + slots``) once released. Tickets are handed out under small
+    locks; semaphores let producers and consumers block instead of spinning.
+    Rows are written straight into the slot and read back as views, so
+    nothing is pickled or copied through a pipe.
+    """
+
+    def __init__(self, slots=64, max_rows=8, max_features=667, ctx=None):
+        """
+        Create the ring buffer
+
+        Args:
+            slots: Number of slots in the ring
+            max_rows: Rows per slot (batch size)
+            max_features: Maximum features per row
+            ctx: multiprocessing context used for the locks and semaphores
+        """
+        ctx = ctx or mp.get_context()
+        self.slots = slots
+        self.max_rows = max_rows
+        self.max_features = max_features
+        self.slot_bytes = max_rows * max_features * max(dtype.itemsize for dtype in DTYPES)
+
+        size = slots * SLOT_HEADER.itemsize + slots * self.slot_bytes
+        self._shm = shared_memory.SharedMemory(create=True, size=size)
+        self.name = self._shm.name
+        self._owner = True
+
+        self._head = ctx.Value('q', 0)
+        self._tail = ctx.Value('q', 0)
+        self._free = ctx.Semaphore(slots)
+        self._filled = ctx.Semaphore(0)
+        self._map()
+        self._headers['seq'] = np.arange(slots)
+
+    def _map(self):
+        header_bytes = self.slots * SLOT_HEADER.itemsize
+        self._headers = np.ndarray((self.slots,), dtype=SLOT_HEADER, buffer=self._shm.buf)
+        self._payload = np.ndarray((self.slots, self.slot_bytes), dtype=np.uint8,
+                                   buffer=self._shm.buf, offset=header_bytes)
+
+    def __getstate__(self):
+        # Passed to worker processes by name; they attach to the same block
+        state = self.__dict__.copy()
+        for key in ('_shm', '_headers', '_payload'):
+            del state[key]
+        state['_owner'] = False
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._shm = _attach(self.name)
+        self._map()
+
+    def _wait_for_seq(self, slot, expected):
+        # Another process holds an earlier ticket for this slot and hasn't finished with it yet
+        while self._headers['seq'][slot] != expected:
+            time.sleep(0)
+
+    def put(self, rows, request_id=0, tag=0, timeout=None):
+        """Copy a (n_rows, n_features) array into the next free slot"""
+        rows = np.ascontiguousarray(rows)
+        if rows.ndim == 1:
+            rows = rows.reshape(1, -1)
+        if rows.dtype not in DTYPE_CODES:
+            rows = rows.astype(np.float32)
+        n_rows, n_features = rows.shape
+        if n_rows > self.max_rows or n_features > self.max_features:
+            raise ValueError(f"Batch of shape {rows.shape} does not fit a ({self.max_rows}, {self.max_features}) slot")
+
+        if not self._free.acquire(timeout=timeout):
+            raise Full()
+        with self._head.get_lock():
+            pos = self._head.value
+            self._head.value += 1
+        slot = pos % self.slots
+        self._wait_for_seq(slot, pos)
+
+        nbytes = rows.nbytes
+        self._payload[slot, :nbytes] = rows.reshape(-1).view(np.uint8)
+        header = self._headers[slot]
+        header['request_id'] = request_id
+        header['n_rows'] = n_rows
+        header['n_features'] = n_features
+        header['dtype'] = DTYPE_CODES[rows.dtype]
+        header['tag'] = tag
+        # Publishing the sequence number hands the slot to consumers
+        self._headers['seq'][slot] = pos + 1
+        self._filled.release()
+
+    def get(self, timeout=None):
+        """
+        Claim the next filled slot
+
+        Returns (ticket, request_id, tag, rows); ``rows`` is a view into shared
+        memory that stays valid until ``release(ticket)`` is called.
+        """
+        if not self._filled.acquire(timeout=timeout):
+            raise Empty()
+        with self._tail.get_lock():
+            pos = self._tail.value
+            self._tail.value += 1
+        slot = pos % self.slots
+        self._wait_for_seq(slot, pos + 1)
+
+        header = self._headers[slot]
+        dtype = DTYPES[header['dtype']]
+        count = int(header['n_rows']) * int(header['n_features'])
+        rows = self._payload[slot, :count * dtype.itemsize].view(dtype).reshape(int(header['n_rows']), -1)
+        return pos, int(header['request_id']), int(header['tag']), rows
+
+    def release(self, ticket):
+        """Return a slot claimed by get() to producers"""
+        slot = ticket % self.slots
+        self._headers['seq'][slot] = ticket + self.slots
+        self._free.release()
+
+    def close(self):
+        """Detach (and unlink, in the creating process)"""
+        self._headers = None
+        self._payload = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
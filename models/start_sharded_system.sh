@@ -0,0 +1,67 @@
+#!/bin/bash
+
+# Sharded receiver deployment on one machine:
+#   - N receivers on consecutive ports from SHARD_BASE_PORT (config.py)
+#   - router.py on the receiver port (5000), so the Firebase relay and the
+#     frontend proxy talk to it unchanged
+#
+# Usage: ./start_sharded_system.sh [number_of_receivers]
+
+cd "$(dirname "$0")"
+
+SHARDS=${1:-$(python3 -c "from config import config; print(config.SHARD_COUNT)")}
+BASE_PORT=$(python3 -c "from config import config; print(config.SHARD_BASE_PORT)")
+ROUTER_PORT=$(python3 -c "from config import config; print(config.RECEIVER_PORT)")
+
+echo "🚀 Starting sharded ECG Model System ($SHARDS receivers)..."
+
+# Kill any existing processes on our ports
+for ((i = 0; i < SHARDS; i++)); do
+    PORT=$((BASE_PORT + i))
+    if lsof -Pi :$PORT -sTCP:LISTEN -t >/dev/null 2>&1; then
+        echo "🧹 Killing process on port $PORT"
+        lsof -ti:$PORT | xargs kill -9
+    fi
+done
+if lsof -Pi :$ROUTER_PORT -sTCP:LISTEN -t >/dev/null 2>&1; then
+    echo "🧹 Killing process on port $ROUTER_PORT"
+    lsof -ti:$ROUTER_PORT | xargs kill -9
+fi
+
+SHARD_URLS=""
+for ((i = 0; i < SHARDS; i++)); do
+    PORT=$((BASE_PORT + i))
+    echo "🧠 Starting Model Receiver on port $PORT..."
+    nohup python3 receiver.py --port $PORT > receiver_$PORT.log 2>&1 &
+    echo "✅ Receiver started with PID: $!"
+    SHARD_URLS="${SHARD_URLS:+$SHARD_URLS,}http://localhost:$PORT"
+done
+
+# Wait for receivers to load their models
+echo "⏳ Waiting for receivers to initialize..."
+for ((i = 0; i < SHARDS; i++)); do
+    PORT=$((BASE_PORT + i))
+    for attempt in $(seq 1 30); do
+        if curl -s http://localhost:$PORT/health > /dev/null; then
+            echo "✅ Receiver on port $PORT is healthy"
+            break
+        fi
+        sleep 1
+    done
+done
+
+echo "🔀 Starting Shard Router on port $ROUTER_PORT..."
+nohup python3 router.py --shards "$SHARD_URLS" --port $ROUTER_PORT > router.log 2>&1 &
+echo "✅ Router started with PID: $!"
+sleep 3
+
+if curl -s http://localhost:$ROUTER_PORT/health > /dev/null; then
+    echo "✅ Router is healthy"
+else
+    echo "❌ Router health check failed"
+    exit 1
+fi
+
+echo ""
+echo "📊 Shard status: curl http://localhost:$ROUTER_PORT/shards"
+echo "🛑 To stop: ./stop_system.sh"
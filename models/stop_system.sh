@@ -76,6 +76,7 @@ echo "=========================================="
 # Stop Python processes
 stop_process "python3 server.py" "Data Server"
 stop_process "python3 receiver.py" "Model Receiver"
+stop_process "python3 router.py" "Shard Router"
 
 # Stop Node.js processes
 stop_process "npm start" "React Frontend"
@@ -101,6 +102,7 @@ echo "🧹 Cleaning up remaining processes..."
 # Kill any remaining Python processes related to our system
 pkill -f "python.*server" 2>/dev/null
 pkill -f "python.*receiver" 2>/dev/null
+pkill -f "python.*router" 2>/dev/null
 
 # Kill any remaining Node processes related to our system
 pkill -f "node.*frontend" 2>/dev/null
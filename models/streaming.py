@@ -0,0 +1,130 @@
+import threading
+import numpy as np
+
+
+def parse_samples(samples):
+    """
+    Validate a chunk's samples and return them as a float32 array
+
+    Raises ValueError for a missing/empty sample list or values that are not
+    finite numbers, which would otherwise shift every later window.
+    """
+    if isinstance(samples, np.ndarray):
+        valid_type = samples.dtype.kind in 'iuf'
+    elif isinstance(samples, (list, tuple)):
+        valid_type = all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in samples)
+    else:
+        raise ValueError("Chunk has no samples list")
+    if len(samples) == 0:
+        raise ValueError("Chunk has no samples")
+    if not valid_type:
+        raise ValueError("Samples must be numbers")
+    samples = np.asarray(samples, dtype=np.float32).ravel()
+    if not np.isfinite(samples).all():
+        raise ValueError("Samples must be finite")
+    return samples
+
+
+class SlidingWindowBuffer:
+    """Per-device ring buffer that turns a continuous sample stream into windows"""
+
+    def __init__(self, window_size, hop_size, capacity=None):
+        """
+        Initialize the sliding window buffer
+
+        Args:
+            window_size: Number of samples per emitted window
+            hop_size: Number of new samples between consecutive windows
+            capacity: Ring capacity in samples (defaults to window_size + hop_size)
+        """
+        if window_size <= 0 or hop_size <= 0:
+            raise ValueError("window_size and hop_size must be positive")
+
+        self.window_size = window_size
+        self.hop_size = hop_size
+        self.capacity = max(capacity or window_size + hop_size, window_size, hop_size)
+
+        # Every sample is written twice (at i and i + capacity) so that any
+        # window is a contiguous slice and can be handed out as a view.
+        self._buffer = np.zeros(2 * self.capacity, dtype=np.float32)
+        self.samples_seen = 0
+        self.windows_emitted = 0
+        self.windows_shed = 0
+        self._next_window_end = window_size
+        self.lock = threading.Lock()
+
+    def reset(self):
+        """Drop buffered history and start a new signal"""
+        self.samples_seen = 0
+        self.windows_emitted = 0
+        self._next_window_end = self.window_size
+
+    def _write(self, samples):
+        """Write samples into the ring (len(samples) <= capacity)"""
+        start = self.samples_seen % self.capacity
+        first = min(len(samples), self.capacity - start)
+        self._buffer[start:start + first] = samples[:first]
+        self._buffer[start + self.capacity:start + self.capacity + first] = samples[:first]
+        if first < len(samples):
+            rest = len(samples) - first
+            self._buffer[:rest] = samples[first:]
+            self._buffer[self.capacity:self.capacity + rest] = samples[first:]
+        self.samples_seen += len(samples)
+
+    def push(self, samples):
+        """
+        Append samples and yield every window that becomes complete
+
+        Yields (window_index, start_sample, window) tuples. ``window`` is a
+        read-only view into the ring and is only valid until the generator is
+        advanced, so consumers must score (or copy) it before continuing.
+        """
+        samples = np.asarray(samples, dtype=np.float32).ravel()
+        offset = 0
+        while offset < len(samples):
+            # Never write past the end of the next window so it can't be
+            # overwritten before it has been handed out.
+            step = min(len(samples) - offset, self._next_window_end - self.samples_seen)
+            self._write(samples[offset:offset + step])
+            offset += step
+
+            if self.samples_seen == self._next_window_end:
+                window_start = self.samples_seen - self.window_size
+                ring_start = window_start % self.capacity
+                window = self._buffer[ring_start:ring_start + self.window_size]
+                window.flags.writeable = False
+                yield self.windows_emitted, window_start, window
+                self.windows_emitted += 1
+                self._next_window_end += self.hop_size
+
+
+class StreamRegistry:
+    """Holds one SlidingWindowBuffer per device id"""
+
+    def __init__(self, window_size, hop_size):
+        self.window_size = window_size
+        self.hop_size = hop_size
+        self._buffers = {}
+        self._lock = threading.Lock()
+
+    def get(self, device_id, hop_size=None):
+        """Get (or create) the buffer for a device, recreating it if a different hop is requested"""
+        with self._lock:
+            buffer = self._buffers.get(device_id)
+            if buffer is None or (hop_size and buffer.hop_size != hop_size):
+                buffer = SlidingWindowBuffer(self.window_size, hop_size or self.hop_size)
+                self._buffers[device_id] = buffer
+            return buffer
+
+    def stats(self):
+        """Per-device sample and window counters"""
+        with self._lock:
+            return {
+                device_id: {
+                    'samples_seen': buffer.samples_seen,
+                    'windows_emitted': buffer.windows_emitted,
+                    'windows_shed': buffer.windows_shed,
+                    'hop_size': buffer.hop_size
+                }
+                for device_id, buffer in self._buffers.items()
+            }
@@ -168,6 +168,645 @@ def test_frontend_connection():
         print(f"❌ Frontend connection test failed: {e}")
         return False
 
+def test_sliding_window_buffer():
+    """Test that streamed chunks produce exactly the windows of the full signal"""
+    try:
+        from streaming import SlidingWindowBuffer, parse_samples
+        
+        rng = np.random.default_rng(0)
+        window_size = 187
+        signal = rng.random(5000).astype(np.float32)
+        failures = []
+        # Hop below, equal to and above the window size; chunk sizes from 1 sample
+        # to several ring capacities, so chunks regularly straddle the wrap point
+        for hop_size in (1, 94, 187, 250):
+            for max_chunk in (1, 25, 300, 1000):
+                buffer = SlidingWindowBuffer(window_size, hop_size)
+                windows = []
+                offset = 0
+                while offset < len(signal):
+                    size = int(rng.integers(1, max_chunk + 1))
+                    for index, start, window in buffer.push(signal[offset:offset + size]):
+                        windows.append((index, start, window.copy()))
+                    offset += size
+                
+                expected_starts = list(range(0, len(signal) - window_size + 1, hop_size))
+                if [start for _, start, _ in windows] != expected_starts:
+                    failures.append(f"hop {hop_size}, chunks <= {max_chunk}: wrong window starts")
+                elif any(index != position or not np.array_equal(window, signal[start:start + window_size])
+                         for position, (index, start, window) in enumerate(windows)):
+                    failures.append(f"hop {hop_size}, chunks <= {max_chunk}: window contents differ")
+        
+        for bad in (None, [], ['a', 1], [1.0, None], [True, 2.0], [1.0, float('nan')]):
+            try:
+                parse_samples(bad)
+                failures.append(f"samples {bad!r} were accepted")
+            except ValueError:
+                pass
+        
+        if failures:
+            print("❌ Sliding window buffer errors:")
+            for failure in failures:
+                print(f"   {failure}")
+            return False
+        print("✅ Sliding window buffer emits the expected windows")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Sliding window buffer test failed: {e}")
+        return False
+
+def test_admission_controller():
+    """Test admission priorities, queue limits, eviction and deadlines without services"""
+    try:
+        import threading
+        from datetime import datetime, timedelta, timezone
+        from admission import (AdmissionController, AdmissionRejected, deadline_from_timestamp,
+                               PRIORITY_ABNORMAL, PRIORITY_NON_COMPRESSED, PRIORITY_COMPRESSED)
+        
+        failures = []
+        now = datetime.now(timezone.utc)
+        budget = 25
+        for label, timestamp, expected_age in (("aware UTC", now.isoformat(), 0),
+                                               ("aware, 10 s old", (now - timedelta(seconds=10)).isoformat(), 10),
+                                               ("naive", datetime.now().isoformat(), 0),
+                                               ("hours old (skew)", (now - timedelta(hours=5)).isoformat(), 0),
+                                               ("future (skew)", (now + timedelta(minutes=5)).isoformat(), 0),
+                                               ("garbage", "not a time", 0)):
+            remaining = deadline_from_timestamp(timestamp, budget) - time.time()
+            if abs(remaining - (budget - expected_age)) > 1:
+                failures.append(f"deadline for {label} timestamp: {remaining:.1f} s left")
+        
+        controller = AdmissionController(workers=1, max_queue_depth=3)
+        gate = threading.Event()
+        order = []
+        outcomes = {}
+        
+        def submit(name, priority, deadline=None):
+            try:
+                outcomes[name] = controller.submit(lambda: gate.wait() and order.append(name) or name,
+                                                   priority=priority, deadline=deadline)
+            except AdmissionRejected as e:
+                outcomes[name] = e.status_code
+        
+        threads = []
+        for name, priority, deadline in (("blocker", PRIORITY_COMPRESSED, None),
+                                         ("compressed", PRIORITY_COMPRESSED, None),
+                                         ("non_compressed", PRIORITY_NON_COMPRESSED, None),
+                                         ("expiring", PRIORITY_COMPRESSED, time.time() + 0.3),
+                                         ("full", PRIORITY_COMPRESSED, None),
+                                         ("abnormal", PRIORITY_ABNORMAL, None)):
+            thread = threading.Thread(target=submit, args=(name, priority, deadline))
+            thread.start()
+            threads.append(thread)
+            time.sleep(0.05)
+        time.sleep(0.5)
+        gate.set()
+        for thread in threads:
+            thread.join(timeout=5)
+        
+        # The queue was full when "full" arrived (429); "abnormal" evicted the newest
+        # compressed job ("expiring", 429) and ran first; nothing else expired
+        expected = {'blocker': 'blocker', 'compressed': 'compressed', 'non_compressed': 'non_compressed',
+                    'expiring': 429, 'full': 429, 'abnormal': 'abnormal'}
+        if outcomes != expected:
+            failures.append(f"outcomes {outcomes}")
+        if order != ['blocker', 'abnormal', 'non_compressed', 'compressed']:
+            failures.append(f"execution order {order}")
+        
+        gate.clear()
+        blocker = threading.Thread(target=submit, args=("blocker", PRIORITY_COMPRESSED))
+        blocker.start()
+        time.sleep(0.05)
+        submit("expires", PRIORITY_NON_COMPRESSED, time.time() + 0.2)
+        gate.set()
+        blocker.join(timeout=5)
+        if outcomes.get("expires") != 503:
+            failures.append(f"job past its deadline in the queue returned {outcomes.get('expires')}")
+        
+        if failures:
+            print("❌ Admission controller errors:")
+            for failure in failures:
+                print(f"   {failure}")
+            return False
+        print("✅ Admission controller prioritises, sheds and expires as expected")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Admission controller test failed: {e}")
+        return False
+
+def test_traffic_recording_roundtrip():
+    """Test that recorded request bodies read back unchanged, in order"""
+    try:
+        import os
+        import tempfile
+        from traffic_recorder import TrafficRecorder, read_recording
+        
+        rng = np.random.default_rng(0)
+        records = []
+        for index in range(50):
+            path = '/process_compressed' if index % 3 else '/process_non_compressed'
+            if index % 5 == 0:
+                body = rng.bytes(64)  # incompressible: stored raw
+            else:
+                body = json.dumps({'timestamp': f't{index}', 'data': [0.5] * 187}).encode()
+            records.append((1700000000.0 + index * 0.25, path, body))
+        
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'traffic.bin')
+            recorder = TrafficRecorder(path)
+            for arrival_time, endpoint, body in records:
+                recorder.record(endpoint, body, arrival_time)
+            recorder.record('/stream/ecg-device-1', b'{}')  # not replayable: ignored
+            recorder.close()
+            
+            # A crash mid-write leaves a truncated trailing record, which is skipped
+            with open(path, 'ab') as f:
+                f.write(b'\x00' * 7)
+            read_back = list(read_recording(path))
+        
+        if read_back != records:
+            print(f"❌ Recording round trip differs ({len(read_back)} of {len(records)} records read back)")
+            return False
+        print("✅ Traffic recordings round-trip unchanged")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Traffic recording test failed: {e}")
+        return False
+
+def _ring_consumer(ring, results, count):
+    """Spawned consumer for test_shared_ring_buffer: sends back (request_id, tag, row sums)"""
+    for _ in range(count):
+        ticket, request_id, tag, rows = ring.get(timeout=10)
+        results.put((request_id, tag, rows.dtype.str, rows.astype(np.float64).sum(axis=1).tolist()))
+        ring.release(ticket)
+
+def test_shared_ring_buffer():
+    """Test shared-memory ring round trips in-process and across processes"""
+    try:
+        import multiprocessing as mp
+        from shm_transport import SharedRingBuffer, Empty, Full
+        
+        failures = []
+        rng = np.random.default_rng(0)
+        ring = SharedRingBuffer(slots=4, max_rows=3, max_features=667)
+        try:
+            # Several laps around the ring with both payload dtypes and varying shapes
+            for request_id in range(10):
+                n_rows, n_features = int(rng.integers(1, 4)), int(rng.choice([187, 667]))
+                dtype = np.uint8 if request_id % 2 else np.float32
+                rows = (rng.random((n_rows, n_features)) * 255).astype(dtype)
+                ring.put(rows, request_id=request_id, tag=request_id % 3)
+                ticket, got_id, tag, got = ring.get(timeout=1)
+                if got_id != request_id or tag != request_id % 3 or got.dtype != dtype or not np.array_equal(got, rows):
+                    failures.append(f"round trip {request_id} differs")
+                ring.release(ticket)
+            
+            for _ in range(4):
+                ring.put(np.zeros(187, dtype=np.float32))
+            try:
+                ring.put(np.zeros(187, dtype=np.float32), timeout=0.1)
+                failures.append("put into a full ring did not raise Full")
+            except Full:
+                pass
+            for _ in range(4):
+                ring.release(ring.get(timeout=1)[0])
+            try:
+                ring.get(timeout=0.1)
+                failures.append("get from an empty ring did not raise Empty")
+            except Empty:
+                pass
+            try:
+                ring.put(np.zeros((4, 187), dtype=np.float32))
+                failures.append("oversized batch was accepted")
+            except ValueError:
+                pass
+        finally:
+            ring.close()
+        
+        # Producer here, consumer in a spawned process (as with the model workers)
+        ctx = mp.get_context('spawn')
+        ring = SharedRingBuffer(slots=4, max_rows=2, max_features=187, ctx=ctx)
+        results = ctx.Queue()
+        count = 40
+        consumer = ctx.Process(target=_ring_consumer, args=(ring, results, count), daemon=True)
+        consumer.start()
+        try:
+            expected = {}
+            for request_id in range(count):
+                rows = rng.random((2, 187)).astype(np.float32)
+                expected[request_id] = rows.astype(np.float64).sum(axis=1)
+                ring.put(rows, request_id=request_id, tag=1, timeout=10)
+            for _ in range(count):
+                request_id, tag, dtype, sums = results.get(timeout=10)
+                if tag != 1 or dtype != np.dtype(np.float32).str or not np.allclose(sums, expected.pop(request_id)):
+                    failures.append(f"cross-process request {request_id} differs")
+            consumer.join(timeout=10)
+        finally:
+            ring.close()
+        
+        if failures:
+            print("❌ Shared ring buffer errors:")
+            for failure in failures:
+                print(f"   {failure}")
+            return False
+        print("✅ Shared ring buffer round-trips rows in-process and across processes")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Shared ring buffer test failed: {type(e).__name__}: {e}")
+        return False
+
+def test_fused_inference_equivalence():
+    """Test that fused scaler+model inference matches the original sklearn pipelines"""
+    try:
+        from sklearn.preprocessing import StandardScaler
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.svm import SVC, LinearSVC
+        from fused_models import fuse_scaler_and_model, compare_with_pipeline
+        from cascade import prediction_margin
+        
+        rng = np.random.default_rng(0)
+        failures = []
+        for n_classes in (2, 5):
+            # Synthetic rows with the training data's shape (187 features)
+            labels = rng.integers(0, n_classes, 600)
+            train = rng.random((600, 187)) * 3 + labels[:, None] * 0.05 + 5
+            test_rows = (rng.random((300, 187)) * 3 + 5).astype(np.float32)
+            scaler = StandardScaler().fit(train)
+            
+            for model in (LogisticRegression(max_iter=300), LinearSVC(), SVC(kernel='linear'),
+                          SVC(kernel='rbf'), SVC(kernel='poly'), SVC(kernel='sigmoid')):
+                model.fit(scaler.transform(train), labels)
+                fused = fuse_scaler_and_model(scaler, model)
+                agreement = compare_with_pipeline(scaler, model, fused, test_rows)
+                if agreement < 1.0:
+                    failures.append(f"{model} ({n_classes} classes): {agreement:.2%} agreement")
+                if isinstance(model, LogisticRegression):
+                    original = model.predict_proba(scaler.transform(test_rows))
+                    if not np.allclose(original, fused.predict_proba(test_rows), atol=1e-6):
+                        failures.append(f"{model} ({n_classes} classes): predict_proba differs")
+                
+                # The cascade must see the same prediction / margin (None without probabilities)
+                for row in test_rows[:20]:
+                    row = row.reshape(1, -1)
+                    expected = prediction_margin(model, scaler.transform(row))
+                    actual = prediction_margin(fused, row)
+                    if expected[0] != actual[0] or (expected[1] is None) != (actual[1] is None) or \
+                            (expected[1] is not None and abs(expected[1] - actual[1]) > 1e-5):
+                        failures.append(f"{model} ({n_classes} classes): cascade margin {actual} != {expected}")
+                        break
+        
+        if failures:
+            print("❌ Fused inference differs from the original pipelines:")
+            for failure in failures:
+                print(f"   {failure}")
+            return False
+        print("✅ Fused inference matches the original pipelines")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Fused inference equivalence test failed: {e}")
+        return False
+
+def test_model_compaction_equivalence():
+    """Test that compacted KNN / random forest models predict like the originals"""
+    try:
+        from sklearn.neighbors import KNeighborsClassifier
+        from sklearn.ensemble import RandomForestClassifier, ExtraTreesClassifier
+        from compact_models import compact_model
+        
+        rng = np.random.default_rng(0)
+        labels = rng.integers(0, 5, 600)
+        train = rng.random((600, 187)) * 0.5 + labels[:, None] * 0.1
+        # zlib-style byte features are stored losslessly as uint8
+        train_bytes = np.round(train * 200)
+        test_rows = rng.random((300, 187)) * 0.5 + rng.integers(0, 5, 300)[:, None] * 0.1
+        
+        failures = []
+        for model, X, rows in ((KNeighborsClassifier(5), train, test_rows),
+                               (KNeighborsClassifier(5, weights='distance'), train, test_rows),
+                               (KNeighborsClassifier(5), train_bytes, np.round(test_rows * 200)),
+                               (RandomForestClassifier(20, random_state=0), train, test_rows),
+                               (ExtraTreesClassifier(20, random_state=0), train, test_rows)):
+            model.fit(X, labels)
+            compact = compact_model(model)
+            agreement = float(np.mean(model.predict(rows) == compact.predict(rows)))
+            if agreement < 1.0:
+                failures.append(f"{model}: {agreement:.2%} agreement")
+            if not np.allclose(model.predict_proba(rows), compact.predict_proba(rows), atol=1e-6):
+                failures.append(f"{model}: predict_proba differs")
+        
+        if failures:
+            print("❌ Compacted models differ from the originals:")
+            for failure in failures:
+                print(f"   {failure}")
+            return False
+        print("✅ Compacted models match the originals")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Model compaction equivalence test failed: {e}")
+        return False
+
+def test_consistent_hash_router():
+    """Test shard assignment, failover order and health-aware routing without services"""
+    try:
+        import socket
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from router import HashRing, ShardRouter
+        
+        nodes = [f"http://127.0.0.1:{5101 + index}" for index in range(4)]
+        ring = HashRing(nodes)
+        keys = [f"ecg-device-{index}" for index in range(2000)]
+        failures = []
+        
+        owners = {key: ring.candidates(key)[0] for key in keys}
+        if any(HashRing(nodes).candidates(key)[0] != owner for key, owner in owners.items()):
+            failures.append("a key mapped to a different shard on an identical ring")
+        for key in keys[:200]:
+            candidates = ring.candidates(key)
+            if sorted(candidates) != sorted(nodes) or candidates[0] != owners[key]:
+                failures.append(f"candidates for {key}: {candidates}")
+                break
+        shares = {node: list(owners.values()).count(node) / len(keys) for node in nodes}
+        if min(shares.values()) < 0.1:
+            failures.append(f"uneven shard shares {shares}")
+        
+        # Removing a node moves only its own keys, each to the next shard in its failover order
+        removed = nodes[1]
+        smaller = HashRing([node for node in nodes if node != removed])
+        for key, owner in owners.items():
+            expected = ring.candidates(key)[1] if owner == removed else owner
+            if smaller.candidates(key)[0] != expected:
+                failures.append(f"{key} moved from {owner} to {smaller.candidates(key)[0]} after removing {removed}")
+                break
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                self.send_response(200)
+                self.end_headers()
+                self.wfile.write(b'{}')
+            
+            def log_message(self, *args):
+                pass
+        
+        # Live shard on a free port; the dead shard is a port nobody listens on
+        server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        with socket.socket() as s:
+            s.bind(('127.0.0.1', 0))
+            dead = f"http://127.0.0.1:{s.getsockname()[1]}"
+        live = f"http://127.0.0.1:{server.server_address[1]}"
+        
+        # Built without __init__ so no health-check thread or Flask app is started
+        router = ShardRouter.__new__(ShardRouter)
+        router.shard_urls = [dead, live]
+        router.ring = HashRing(router.shard_urls)
+        router.healthy = {url: True for url in router.shard_urls}
+        router.health_lock = threading.Lock()
+        router.routed = {url: 0 for url in router.shard_urls}
+        router.rerouted = 0
+        
+        key = next(key for key in keys if router.ring.candidates(key)[0] == dead)
+        response = router.forward(key, '/process_non_compressed', data=b'{}')
+        if response.status_code != 200 or router.rerouted != 1 or router.healthy[dead]:
+            failures.append(f"failover: status {response.status_code}, rerouted {router.rerouted}, "
+                            f"dead shard healthy {router.healthy[dead]}")
+        if router.shards_for(key) != [live]:
+            failures.append(f"shards_for kept an unhealthy shard: {router.shards_for(key)}")
+        router.mark(live, False)
+        if router.shards_for(key) != [dead, live]:
+            failures.append(f"with no healthy shard shards_for returned {router.shards_for(key)}")
+        server.shutdown()
+        server.server_close()
+        
+        if failures:
+            print("❌ Consistent-hash router errors:")
+            for failure in failures:
+                print(f"   {failure}")
+            return False
+        print("✅ Consistent-hash router assigns, moves and fails over keys as expected")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Consistent-hash router test failed: {e}")
+        return False
+
+def test_log_sampling_filter():
+    """Test log rate limiting, suppressed counts and window cleanup without services"""
+    try:
+        import io
+        import logging
+        from log_pipeline import build_queue_handler
+        
+        output = io.StringIO()
+        handler, listener = build_queue_handler(output, max_per_second=5)
+        sampling = handler.filters[0]
+        test_logger = logging.getLogger('test_system.sampling')
+        test_logger.propagate = False
+        test_logger.setLevel(logging.DEBUG)
+        test_logger.addHandler(handler)
+        listener.start()
+        failures = []
+        try:
+            # Start right after a second boundary so the burst normally falls in one window
+            time.sleep(1 - time.monotonic() % 1 + 0.01)
+            first_second = int(time.monotonic())
+            for index in range(200):
+                test_logger.info("alpha %d", index)
+                test_logger.info("beta %d", index)
+                test_logger.warning("gamma %d", index)
+            seconds = int(time.monotonic()) - first_second + 1
+            
+            time.sleep(1.1)
+            test_logger.info("alpha %d", -1)
+            
+            # f-string style messages: one key per distinct text
+            for index in range(3000):
+                test_logger.info(f"unique message {index}")
+            time.sleep(2.1)
+            test_logger.info("after the sweep")
+            windows = len(sampling._windows)
+        finally:
+            listener.stop()
+            test_logger.removeHandler(handler)
+        
+        lines = output.getvalue().splitlines()
+        counts = {name: sum(1 for line in lines if f" - {name} " in line) for name in ('alpha', 'beta', 'gamma')}
+        # 5 per template per window, plus the alpha record of the next second
+        if not 5 <= counts['beta'] <= 5 * seconds or not 6 <= counts['alpha'] <= 5 * seconds + 1:
+            failures.append(f"rate limited templates passed {counts['alpha']} / {counts['beta']} records "
+                            f"over {seconds} window(s)")
+        if counts['gamma'] != 200:
+            failures.append(f"{counts['gamma']} of 200 WARNING records passed")
+        if not any("alpha -1" in line and "similar suppressed" in line for line in lines):
+            failures.append("first record of the next second doesn't report the suppressed count")
+        unique_passed = sum(1 for line in lines if "unique message" in line)
+        if sampling.dropped != 2 * 200 - counts['beta'] - (counts['alpha'] - 1) + 3000 - unique_passed:
+            failures.append(f"dropped counter {sampling.dropped} doesn't match the records filtered out")
+        if windows != 1:
+            failures.append(f"{windows} rate-limit windows left after the sweep, expected 1")
+        
+        if failures:
+            print("❌ Log sampling filter errors:")
+            for failure in failures:
+                print(f"   {failure}")
+            return False
+        print("✅ Log sampling filter rate limits, counts suppressions and forgets old windows")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Log sampling filter test failed: {e}")
+        return False
+
+class _FixedProbaModel:
+    """Classifier stand-in that returns the same class probabilities for every row"""
+    
+    def __init__(self, proba):
+        self.proba = np.array(proba)
+        self.classes_ = np.arange(len(proba))
+    
+    def predict_proba(self, X):
+        return np.tile(self.proba, (len(X), 1))
+    
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+class _NoProbaModel:
+    """Classifier stand-in without predict_proba (like SVC trained with probability=False)"""
+    
+    def predict(self, X):
+        return np.ones(len(X), dtype=int)
+
+def test_cascade_scheduler():
+    """Test cascade stopping, escalation and statistics on synthetic models without services"""
+    from config import config
+    saved = (config.CASCADE_ORDER, config.CASCADE_MARGIN_THRESHOLD, config.CASCADE_AUDIT_RATE)
+    try:
+        from receiver import ModelReceiver
+        from cascade import CascadeStats
+        
+        receiver = ModelReceiver.__new__(ModelReceiver)
+        receiver.worker_pool = None
+        receiver.cascade_stats = CascadeStats()
+        # Predictions (margin): weak 0 (0.1), no_proba 1 (None), strong 1 (0.5), last 1 (0.1)
+        receiver.model_sets = {'standard': {
+            'weak': (None, _FixedProbaModel([0.55, 0.45])),
+            'no_proba': (None, _NoProbaModel()),
+            'strong': (None, _FixedProbaModel([0.25, 0.75])),
+            'last': (None, _FixedProbaModel([0.45, 0.55]))
+        }}
+        config.CASCADE_AUDIT_RATE = 1.0
+        row = np.zeros(187, dtype=np.float32)
+        
+        failures = []
+        # (order, threshold, expected answering stage, models run, models skipped, prediction)
+        for order, threshold, stage, models_run, skipped, prediction in (
+                (['weak', 'no_proba', 'strong', 'last'], 0.5, 'strong', 3, 1, 1),  # margin == threshold stops
+                (['weak', 'no_proba', 'last'], 0.5, 'last', 3, 0, 1),  # last stage answers unconfident
+                (['weak', 'strong'], 0.05, 'weak', 1, 1, 0)):  # first stage answers
+            config.CASCADE_ORDER, config.CASCADE_MARGIN_THRESHOLD = order, threshold
+            cascade = receiver.run_models_on_data(row, "non_compressed", "cascade")['cascade']
+            if (cascade['stage'], cascade['models_run'], cascade['prediction']) != (stage, models_run, prediction):
+                failures.append(f"order {order}: answered by {cascade['stage']} after {cascade['models_run']} "
+                                f"models with {cascade['prediction']}")
+        
+        # The full-ensemble audit (all four models) votes 1, so only the last request disagrees
+        summary = receiver.cascade_stats.summary()
+        expected = {'requests': 3, 'models_run': 7, 'models_skipped': 2, 'audits': 3,
+                    'answered_by_stage': {'strong': 1, 'last': 1, 'weak': 1}}
+        actual = {key: summary[key] for key in expected}
+        if actual != expected:
+            failures.append(f"summary {actual}, expected {expected}")
+        if abs(summary['agreement_lost'] - 1 / 3) > 1e-9:
+            failures.append(f"agreement_lost {summary['agreement_lost']}, expected 1/3")
+        if not 0 < summary['compute_saved_fraction'] < 1:
+            failures.append(f"compute_saved_fraction {summary['compute_saved_fraction']} with models skipped")
+        
+        # Savings are estimated from the skipped models' latencies in the same model set
+        stats = CascadeStats()
+        stats.record_model_time('standard', 'cheap', 0.01)
+        stats.record_model_time('standard', 'costly', 0.03)
+        stats.record_model_time('zlib', 'costly', 0.5)
+        stats.record_cascade('standard', 'cheap', 1, ['costly'], 0.01)
+        stats.record_cascade('standard', 'costly', 2, [], 0.04)
+        summary = stats.summary()
+        if summary['models_skipped'] != 1 or abs(summary['compute_saved_fraction'] - 0.03 / 0.08) > 1e-9:
+            failures.append(f"models_skipped {summary['models_skipped']}, "
+                            f"compute_saved_fraction {summary['compute_saved_fraction']}, expected 1 and 0.375")
+        merged = CascadeStats.merged([stats.snapshot(), stats.snapshot()]).summary()
+        if merged['requests'] != 4 or abs(merged['compute_saved_fraction'] - summary['compute_saved_fraction']) > 1e-9:
+            failures.append(f"merged snapshots {merged}")
+        
+        if failures:
+            print("❌ Cascade scheduler errors:")
+            for failure in failures:
+                print(f"   {failure}")
+            return False
+        print("✅ Cascade stops at the first confident model and reports its savings")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Cascade scheduler test failed: {e}")
+        return False
+    finally:
+        config.CASCADE_ORDER, config.CASCADE_MARGIN_THRESHOLD, config.CASCADE_AUDIT_RATE = saved
+
+class _BoosterLike:
+    """Pickles like xgboost.Booster: the model lives behind a ctypes handle, __getstate__ returns its raw bytes"""
+    
+    def __init__(self, raw):
+        import ctypes
+        self.handle = ctypes.create_string_buffer(raw, len(raw))
+    
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['handle'] = bytearray(self.handle.raw)
+        return state
+
+def test_model_memory_report():
+    """Test that the memory report counts tree nodes and booster buffers"""
+    try:
+        from sklearn.ensemble import RandomForestClassifier
+        from model_memory import model_bytes, memory_report
+        
+        rng = np.random.default_rng(0)
+        labels = rng.integers(0, 5, 300)
+        train = rng.random((300, 187)) + labels[:, None] * 0.1
+        forest = RandomForestClassifier(10, random_state=0).fit(train, labels)
+        booster = _BoosterLike(b'\0' * 50000)
+        models = [('random_forest', forest, sum(e.tree_.__getstate__()['nodes'].nbytes for e in forest.estimators_)),
+                  ('booster', booster, 50000)]
+        try:
+            import xgboost
+            xgb = xgboost.XGBClassifier(n_estimators=10).fit(train, labels)
+            models.append(('xgboost', xgb, len(xgb.get_booster().save_raw())))
+        except ImportError:
+            print("   xgboost not installed, checking the booster stand-in only")
+        
+        report = memory_report({'standard': {name: (None, model) for name, model, _ in models}})
+        failures = [f"{name}: {report['models']['standard'][name]['bytes']} bytes, expected at least {minimum}"
+                    for name, _, minimum in models if report['models']['standard'][name]['bytes'] < minimum]
+        if report['total_model_bytes'] != sum(model_bytes(model) for _, model, _ in models):
+            failures.append("total_model_bytes is not the sum of unshared models")
+        
+        if failures:
+            print("❌ Memory report undercounts models:")
+            for failure in failures:
+                print(f"   {failure}")
+            return False
+        print("✅ Memory report counts tree nodes and booster buffers")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Model memory report test failed: {e}")
+        return False
+
 def run_all_tests():
     """Run all system tests"""
     print("🚀 Starting ECG Model System Tests with Firebase Functions...")
@@ -180,7 +819,17 @@ def run_all_tests():
         ("Compressed Data Processing (Firebase)", test_compressed_processing),
         ("Receiver Health Check", test_receiver_health),
         ("Results Retrieval", test_results_retrieval),
-        ("Frontend Connection", test_frontend_connection)
+        ("Frontend Connection", test_frontend_connection),
+        ("Sliding Window Buffer", test_sliding_window_buffer),
+        ("Admission Controller", test_admission_controller),
+        ("Traffic Recording Round Trip", test_traffic_recording_roundtrip),
+        ("Shared Ring Buffer", test_shared_ring_buffer),
+        ("Fused Inference Equivalence", test_fused_inference_equivalence),
+        ("Model Compaction Equivalence", test_model_compaction_equivalence),
+        ("Model Memory Report", test_model_memory_report),
+        ("Cascade Scheduler", test_cascade_scheduler),
+        ("Consistent-Hash Router", test_consistent_hash_router),
+        ("Log Sampling Filter", test_log_sampling_filter)
     ]
     
     passed = 0
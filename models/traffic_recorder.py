@@ -0,0 +1,101 @@
+import atexit
+import struct
+import threading
+import time
+import zlib
+
+# File layout: MAGIC, then records of RECORD_HEADER followed by the payload bytes.
+# RECORD_HEADER = arrival time (float64, unix seconds), endpoint code (uint8),
+# flags (uint8), payload length (uint32).
+MAGIC = b'ECGTRAF1'
+RECORD_HEADER = struct.Struct('<dBBI')
+FLAG_ZLIB = 0x01
+
+ENDPOINT_CODES = {
+    '/process_non_compressed': 1,
+    '/process_compressed': 2
+}
+ENDPOINT_PATHS = {code: path for path, code in ENDPOINT_CODES.items()}
+
+
+class TrafficRecorder:
+    """Appends incoming request bodies with their arrival time to a compact binary log"""
+
+    def __init__(self, path, compress_level=1, flush_interval=1.0):
+        """
+        Initialize the traffic recorder
+
+        Args:
+            path: Recording file (appended to if it already exists)
+            compress_level: zlib level for payloads (0 stores them raw)
+            flush_interval: Seconds between flushes, bounding what is lost if the process is killed
+        """
+        self.path = path
+        self.compress_level = compress_level
+        self.flush_interval = flush_interval
+        self._last_flush = time.time()
+        self.records = 0
+        self.bytes_written = 0
+        self._lock = threading.Lock()
+        self._file = open(path, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+        atexit.register(self.close)
+
+    def record(self, endpoint, body, arrival_time=None):
+        """Append one request body; endpoints that are not replayable are ignored"""
+        code = ENDPOINT_CODES.get(endpoint)
+        if code is None:
+            return
+        arrival_time = arrival_time or time.time()
+
+        flags = 0
+        if self.compress_level:
+            packed = zlib.compress(body, self.compress_level)
+            if len(packed) < len(body):
+                body = packed
+                flags |= FLAG_ZLIB
+
+        header = RECORD_HEADER.pack(arrival_time, code, flags, len(body))
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(header)
+            self._file.write(body)
+            self.records += 1
+            self.bytes_written += len(header) + len(body)
+            if arrival_time - self._last_flush >= self.flush_interval:
+                self._file.flush()
+                self._last_flush = arrival_time
+
+    def flush(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def stats(self):
+        return {'path': self.path, 'records': self.records, 'bytes_written': self.bytes_written}
+
+
+def read_recording(path):
+    """Yield (arrival_time, endpoint_path, body) for every complete record in a recording"""
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a traffic recording")
+        while True:
+            header = f.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                # End of file (a truncated trailing record from a crash is skipped)
+                return
+            arrival_time, code, flags, length = RECORD_HEADER.unpack(header)
+            body = f.read(length)
+            if len(body) < length:
+                return
+            if flags & FLAG_ZLIB:
+                body = zlib.decompress(body)
+            yield arrival_time, ENDPOINT_PATHS[code], body